@@ -0,0 +1,32 @@
+"""create outbox table
+
+Revision ID: 260e62b6bba2
+Revises: c5932d2e43cc
+Create Date: 2026-10-18 03:00:01.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "260e62b6bba2"
+down_revision = "c5932d2e43cc"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column("task_name", sa.String(), nullable=False),
+        sa.Column("queue", sa.String(), nullable=True),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("outbox")
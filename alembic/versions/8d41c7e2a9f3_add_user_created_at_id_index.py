@@ -0,0 +1,34 @@
+"""add user created_at id index
+
+Revision ID: 8d41c7e2a9f3
+Revises: 260e62b6bba2
+Create Date: 2026-10-18 03:00:02.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8d41c7e2a9f3"
+down_revision = "260e62b6bba2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 游标分页的排序键索引，在线创建，不锁住用户表的写入
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_created_at_id",
+            "user",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_user_created_at_id", table_name="user", postgresql_concurrently=True
+        )
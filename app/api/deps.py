@@ -1,13 +1,17 @@
-from typing import Generator, Optional
+from functools import lru_cache
+from typing import Generator, Optional, Tuple
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import jwt
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import jwt
+from app.core.principal import cache_principal, get_cached_principal
+from app.core.rate_limit import RateLimit, client_ip, rate_limit_headers, rate_limiter
+from app.core.revocation import revocation_list
+from app.core.security import decode_access_token
 from app.crud.user import user
 from app.db.session import get_db
 
@@ -18,25 +22,53 @@ from app.schemas.user import TokenPayload
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
-async def get_current_user(
-    db: AsyncSession = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> User:
+@lru_cache
+def login_limits() -> Tuple[Optional[RateLimit], ...]:
     """
-    从令牌获取当前用户
+    登录限流规则：按IP、按账号、全局，首次使用时解析
+    """
+    return (
+        RateLimit.parse(settings.RATE_LIMIT_LOGIN_PER_IP),
+        RateLimit.parse(settings.RATE_LIMIT_LOGIN_PER_ACCOUNT),
+        RateLimit.parse(settings.RATE_LIMIT_LOGIN_GLOBAL),
+    )
+
+
+async def get_token_payload(token: str = Depends(reusable_oauth2)) -> TokenPayload:
+    """
+    解析访问令牌，并检查所属会话是否已撤销
     """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
+        token_data = decode_access_token(token)
     except (jwt.JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+    # 撤销检查只查询本地快照，不访问Redis
+    if revocation_list.is_revoked(token_data.sid):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    return token_data
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    token_data: TokenPayload = Depends(get_token_payload),
+) -> User:
+    """
+    从令牌获取当前用户
+    """
+    # 优先使用缓存的用户，避免每个请求都查询数据库
+    user_obj = get_cached_principal(token_data.sub)
+    if user_obj is not None:
+        return user_obj
     user_obj = await user.get(db, id=token_data.sub)
     if not user_obj:
         raise HTTPException(status_code=404, detail="User not found")
+    cache_principal(user_obj)
     return user_obj
 
 
@@ -62,3 +94,51 @@ async def get_current_active_superuser(
             status_code=400, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+def rate_limit(name: str, limit: str):
+    """
+    生成按客户端IP限流的依赖，用于单个路由，例如
+    `dependencies=[Depends(rate_limit("export", "5/minute"))]`
+    """
+    rule = RateLimit.parse(limit)
+
+    async def dependency(request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED or rule is None:
+            return
+        result = await rate_limiter.hit(
+            [(f"{name}:ip:{client_ip(request.scope)}", rule)]
+        )
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="请求过多，请稍后重试",
+                headers=rate_limit_headers(rule, result),
+            )
+
+    return dependency
+
+
+async def limit_login_attempts(
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends()
+) -> None:
+    """
+    登录限流：按客户端IP、账号和全局三个维度限制尝试次数，
+    在验证密码之前执行，超限的请求不会消耗密码哈希和数据库资源
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    per_ip, per_account, global_limit = login_limits()
+    candidates = [
+        (f"login:ip:{client_ip(request.scope)}", per_ip),
+        (f"login:account:{form_data.username.strip().lower()}", per_account),
+        ("login:global", global_limit),
+    ]
+    limits = [(key, rule) for key, rule in candidates if rule is not None]
+    result = await rate_limiter.hit(limits)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="登录请求过多，请稍后重试",
+            headers=rate_limit_headers(limits[0][1], result),
+        )
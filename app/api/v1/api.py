@@ -1,12 +1,15 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, health, time_demo
+from app.api.v1.endpoints import auth, health, metrics, time_demo
 
 api_router = APIRouter()
 
 # 健康检查路由
 api_router.include_router(health.router, prefix="/health", tags=["health"])
 
+# 监控指标路由
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+
 # 时间演示路由
 api_router.include_router(time_demo.router, prefix="/time", tags=["time"])
 
@@ -1,27 +1,43 @@
+import uuid
 from datetime import timedelta
 from typing import Any, Dict
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import jwt
+from loguru import logger
+from pydantic import ValidationError
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import (
     get_current_active_superuser,
     get_current_active_user,
     get_current_user,
+    get_token_payload,
+    limit_login_attempts,
 )
 from app.core.config import settings
-from app.core.security import create_access_token
+from app.core.responses import FastJSONResponse
+from app.core.revocation import revocation_list
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    decode_refresh_token,
+)
 from app.crud.user import user
 from app.db.session import get_db
 from app.models.user import User
-from app.schemas.token import Token
+from app.schemas.token import RefreshTokenRequest, Token
+from app.schemas.user import TokenPayload
 from app.schemas.user import User as UserSchema
 
 router = APIRouter()
 
 
-@router.post("/login", response_model=Token)
+@router.post(
+    "/login", response_model=Token, dependencies=[Depends(limit_login_attempts)]
+)
 async def login_access_token(
     db: AsyncSession = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
@@ -38,13 +54,100 @@ async def login_access_token(
     elif not user.is_active(user_obj):
         raise HTTPException(status_code=400, detail="用户未激活")
 
-    # 创建访问令牌
+    return FastJSONResponse(await _issue_tokens(user_obj.id))
+
+
+async def _issue_tokens(user_id: Any) -> Token:
+    """
+    开启新的登录会话，签发访问令牌和刷新令牌
+
+    Redis不可用导致无法开启会话时只签发访问令牌。
+    """
+    session_id = uuid.uuid4().hex
+    token_id = uuid.uuid4().hex
+    refresh_token = None
+    try:
+        await revocation_list.start_session(
+            session_id, token_id, settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+        )
+        refresh_token = create_refresh_token(user_id, session_id, token_id)
+    except RedisError as exc:
+        logger.warning(f"Could not start refresh session: {exc}")
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        subject=user_obj.id, expires_delta=access_token_expires
+        subject=user_id, expires_delta=access_token_expires, session_id=session_id
+    )
+    return Token(
+        access_token=access_token, token_type="bearer", refresh_token=refresh_token
+    )
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    body: RefreshTokenRequest, db: AsyncSession = Depends(get_db)
+) -> Any:
+    """
+    使用刷新令牌换取新的访问令牌和刷新令牌，旧的刷新令牌随即失效
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED, detail="无效的刷新令牌"
+    )
+    try:
+        token_data = decode_refresh_token(body.refresh_token)
+    except (jwt.JWTError, ValidationError):
+        raise invalid
+    if revocation_list.is_revoked(token_data.sid):
+        raise invalid
+
+    new_token_id = uuid.uuid4().hex
+    try:
+        rotated = await revocation_list.rotate_session(
+            token_data.sid,
+            token_data.jti,
+            new_token_id,
+            settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+        )
+    except RedisError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="暂时无法刷新令牌，请稍后重试",
+        )
+    if not rotated:
+        raise invalid
+
+    user_obj = await user.get(db, id=token_data.sub)
+    if not user_obj or not user.is_active(user_obj):
+        await revocation_list.revoke(token_data.sid)
+        raise invalid
+
+    access_token = create_access_token(
+        subject=user_obj.id,
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        session_id=token_data.sid,
+    )
+    refresh_token = create_refresh_token(user_obj.id, token_data.sid, new_token_id)
+    return FastJSONResponse(
+        Token(
+            access_token=access_token, token_type="bearer", refresh_token=refresh_token
+        )
     )
 
-    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/logout", response_model=Dict[str, str])
+async def logout(token_data: TokenPayload = Depends(get_token_payload)) -> Any:
+    """
+    退出登录，撤销当前会话的访问令牌和刷新令牌
+    """
+    if token_data.sid:
+        try:
+            await revocation_list.revoke(token_data.sid)
+        except RedisError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="暂时无法退出登录，请稍后重试",
+            )
+    return {"message": "已退出登录"}
 
 
 @router.get("/me", response_model=UserSchema)
@@ -54,7 +157,8 @@ async def read_users_me(
     """
     获取当前登录用户信息
     """
-    return current_user
+    # 直接返回序列化好的响应，跳过FastAPI的二次校验和编码
+    return FastJSONResponse(UserSchema.model_validate(current_user))
 
 
 @router.get("/status", response_model=Dict[str, str])
@@ -64,11 +168,13 @@ async def check_auth_status(
     """
     检查认证状态，任何认证用户都可访问
     """
-    return {
-        "status": "authenticated",
-        "user_id": str(current_user.id),
-        "username": current_user.username,
-    }
+    return FastJSONResponse(
+        {
+            "status": "authenticated",
+            "user_id": str(current_user.id),
+            "username": current_user.username,
+        }
+    )
 
 
 @router.get("/admin", response_model=Dict[str, Any])
@@ -2,7 +2,12 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.cache import cache
+from app.core.jobs import job_runner
+from app.core.responses import FastJSONResponse
+from app.core.principal import principal_cache
+from app.core.security import password_hasher, token_cache
+from app.db.session import get_db, pool_stats, replica_health
 
 router = APIRouter()
 
@@ -12,17 +17,75 @@ async def health_check():
     """
     健康检查接口
     """
-    return {"status": "ok", "message": "Service is running"}
+    # 负载均衡器高频探测，直接返回响应，跳过jsonable_encoder
+    return FastJSONResponse({"status": "ok", "message": "Service is running"})
 
 
 @router.get("/db")
 async def db_health_check(db: AsyncSession = Depends(get_db)):
     """
-    数据库健康检查接口
+    数据库健康检查接口，检查主库和每个只读副本
     """
+    replicas = await replica_health()
     try:
-        # 简单查询测试数据库连接
+        # 简单查询测试主库连接
         await db.execute(text("SELECT 1"))
-        return {"status": "ok", "message": "Database connection is healthy"}
+        return {
+            "status": "ok",
+            "message": "Database connection is healthy",
+            "replicas": replicas,
+        }
     except Exception as e:
-        return {"status": "error", "message": f"Database error: {str(e)}"}
+        return {
+            "status": "error",
+            "message": f"Database error: {str(e)}",
+            "replicas": replicas,
+        }
+
+
+@router.get("/db/pool")
+async def db_pool_stats():
+    """
+    数据库连接池统计接口，包括签出等待时间和正在使用的连接数
+    """
+    return pool_stats()
+
+
+@router.get("/password-hasher")
+async def password_hasher_stats():
+    """
+    密码哈希线程池统计接口，区分排队等待时间和哈希耗时
+    """
+    return password_hasher.stats()
+
+
+@router.get("/principal-cache")
+async def principal_cache_stats():
+    """
+    当前用户缓存统计接口
+    """
+    return principal_cache.stats()
+
+
+@router.get("/token-cache")
+async def token_cache_stats():
+    """
+    已验证令牌缓存统计接口
+    """
+    return token_cache.stats()
+
+
+@router.get("/cache")
+async def cache_stats():
+    """
+    两级缓存统计接口，包括各级命中率和L1内存占用
+    """
+    return cache.stats()
+
+
+@router.get("/jobs")
+async def job_runner_stats():
+    """
+    进程内后台任务统计接口，包括队列长度、正在执行的任务数和各类结果计数
+    """
+    return job_runner.stats()
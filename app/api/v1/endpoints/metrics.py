@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from app.core.metrics import render_latest
+
+router = APIRouter()
+
+
+# 不带末尾斜杠，Prometheus抓取 `/api/v1/metrics` 时不会收到307重定向
+@router.get("")
+async def metrics():
+    """
+    Prometheus指标接口
+    """
+    data, content_type = render_latest()
+    return Response(content=data, media_type=content_type)
@@ -0,0 +1,527 @@
+import asyncio
+import functools
+import hashlib
+import secrets
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from inspect import signature
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import msgpack
+from loguru import logger
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.core.metrics import cache_requests_total
+from app.core.redis import get_redis
+from app.db.base_class import Base
+from app.utils.lazy import LazyObject
+from app.utils.lru import LRUCache
+
+# msgpack扩展类型编号
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_UUID = 3
+_EXT_DECIMAL = 4
+_EXT_MODEL = 5
+
+# 缓存键中忽略的参数类型（依赖注入的会话、请求等）
+_IGNORED_ARGUMENT_TYPES = (AsyncSession, Session, Request, Response)
+
+_model_classes: Dict[str, type] = {}
+
+
+def _model_class(name: str) -> type:
+    if name not in _model_classes:
+        for mapper in Base.registry.mappers:
+            _model_classes[mapper.class_.__name__] = mapper.class_
+    return _model_classes[name]
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, obj.bytes)
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(obj).encode())
+    if isinstance(obj, Base):
+        # ORM对象只保存列字段，读取时重建为detached对象
+        values = {
+            attr.key: getattr(obj, attr.key) for attr in inspect(type(obj)).column_attrs
+        }
+        return msgpack.ExtType(_EXT_MODEL, dumps([type(obj).__name__, values]))
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Cannot cache object of type {type(obj).__name__}")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_MODEL:
+        name, values = loads(data)
+        obj = _model_class(name)(**values)
+        make_transient_to_detached(obj)
+        return obj
+    return msgpack.ExtType(code, data)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    使用msgpack序列化缓存值，支持datetime、UUID、Decimal、ORM对象和Pydantic模型
+    """
+    return msgpack.packb(value, default=_default, use_bin_type=True)
+
+
+def loads(data: bytes) -> Any:
+    """
+    反序列化缓存值，ORM对象还原为detached状态
+    """
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False)
+
+
+def entity_tag(table: str, id: Any) -> str:
+    """
+    单个对象的缓存标签
+    """
+    return f"{table}:{id}"
+
+
+def _result_tags(value: Any) -> List[str]:
+    # 返回ORM对象的缓存自动打上对象标签，对象被修改时一并失效
+    items = value if isinstance(value, (list, tuple)) else [value]
+    return [
+        entity_tag(item.__tablename__, inspect(item).identity[0])
+        for item in items
+        if isinstance(item, Base) and inspect(item).identity is not None
+    ]
+
+
+def _key_part(value: Any) -> Optional[str]:
+    if isinstance(value, _IGNORED_ARGUMENT_TYPES):
+        return None
+    cache_key = getattr(value, "__cache_key__", None)
+    if callable(cache_key):
+        return cache_key()
+    if isinstance(value, Base):
+        identity = inspect(value).identity
+        return entity_tag(value.__tablename__, identity[0] if identity else None)
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    return repr(value)
+
+
+class RedisCache:
+    """
+    两级缓存：进程内LRU（L1）在前，Redis（L2）在后
+
+    L1保存序列化后的bytes，每次命中都反序列化出新的对象，不在请求之间共享
+    ORM对象；总大小受 `local_max_bytes` 限制。
+    未命中时使用单飞锁防止缓存击穿：同一进程内的并发请求共享一次计算，
+    不同进程之间通过Redis锁保证只有一个进程回源，其他进程等待结果写入。
+    每个标签对应一个Redis集合，保存带有该标签的缓存键，用于按标签失效；
+    失效的键通过Redis发布订阅通知所有进程清理L1。
+    Redis不可用时直接回源，不影响请求。
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        default_ttl: float,
+        lock_timeout: float,
+        *,
+        local_max_size: int = 0,
+        local_max_bytes: Optional[int] = None,
+        local_ttl: float = 30,
+    ):
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.lock_timeout = lock_timeout
+        self.local_ttl = local_ttl
+        self.local: LRUCache[str, bytes] = LRUCache(
+            maxsize=local_max_size,
+            max_bytes=local_max_bytes,
+            sizeof=lambda key, data: len(key) + len(data),
+        )
+        self.channel = f"{prefix}invalidate"
+        self._inflight: Dict[str, "asyncio.Future[bytes]"] = {}
+        self._handlers: Dict[
+            str, Tuple[Callable[[str], Any], Optional[Callable[[], Any]]]
+        ] = {}
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def make_key(self, namespace: str, arguments: Dict[str, Any]) -> str:
+        """
+        根据命名空间和调用参数生成缓存键
+        """
+        parts = [
+            f"{name}={part}"
+            for name, value in arguments.items()
+            if (part := _key_part(value)) is not None
+        ]
+        digest = hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16)
+        return f"{self.prefix}{namespace}:{digest.hexdigest()}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    async def get_or_set(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        *,
+        ttl: Optional[float] = None,
+        tags: Sequence[str] = (),
+        cache_none: bool = False,
+    ) -> Any:
+        """
+        读取缓存，依次查找L1和Redis，都未命中时调用 `compute` 回源并写入缓存
+        """
+        data = self.local.get(key)
+        if data is not None:
+            cache_requests_total.labels("l1", "hit").inc()
+            return loads(data)
+        cache_requests_total.labels("l1", "miss").inc()
+
+        try:
+            data, remaining_ms = (
+                await get_redis()
+                .pipeline(transaction=False)
+                .get(key)
+                .pttl(key)
+                .execute()
+            )
+        except RedisError as exc:
+            self.errors += 1
+            cache_requests_total.labels("redis", "error").inc()
+            logger.warning(f"Cache read failed for {key}: {exc}")
+            return await compute()
+        if data is not None:
+            self.hits += 1
+            cache_requests_total.labels("redis", "hit").inc()
+            # L1不能比Redis中的键活得更久：键和标签集合过期后，
+            # 之后的写入找不到这个键，也就不会通知其他进程清理L1
+            if remaining_ms > 0:
+                ttl = min(self.default_ttl if ttl is None else ttl, remaining_ms / 1000)
+            self._store_local(key, data, ttl)
+            return loads(data)
+        self.misses += 1
+        cache_requests_total.labels("redis", "miss").inc()
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return loads(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+            except Exception:
+                pass
+            # 首个请求回源失败时各自回源
+            return await compute()
+
+        future: "asyncio.Future[bytes]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value, data = await self._fill(key, compute, ttl, tags, cache_none)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # 没有等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(data)
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def _fill(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[float],
+        tags: Sequence[str],
+        cache_none: bool,
+    ) -> Tuple[Any, bytes]:
+        """
+        获取回源锁后回源并写入缓存，返回值及其序列化结果
+        """
+        redis = get_redis()
+        lock_key = f"{key}:lock"
+        token = secrets.token_hex(8)
+        try:
+            locked = await redis.set(
+                lock_key, token, nx=True, px=int(self.lock_timeout * 1000)
+            )
+            if not locked:
+                data = await self._wait_for(key, lock_key)
+                if data is not None:
+                    self._store_local(key, data, ttl)
+                    return loads(data), data
+        except RedisError as exc:
+            logger.warning(f"Cache lock failed for {key}: {exc}")
+            locked = False
+
+        try:
+            value = await compute()
+            data = dumps(value)
+            if value is not None or cache_none:
+                await self._store(key, data, ttl, [*tags, *_result_tags(value)])
+            return value, data
+        finally:
+            if locked:
+                await self._release(lock_key, token)
+
+    async def _wait_for(self, key: str, lock_key: str) -> Optional[bytes]:
+        """
+        等待持有锁的进程写入缓存，锁释放或超时后返回None
+        """
+        redis = get_redis()
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.005
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+            data, locked = (
+                await redis.pipeline(transaction=False)
+                .get(key)
+                .exists(lock_key)
+                .execute()
+            )
+            if data is not None:
+                return data
+            if not locked:
+                return None
+        return None
+
+    async def _release(self, lock_key: str, token: str) -> None:
+        try:
+            redis = get_redis()
+            if await redis.get(lock_key) == token.encode():
+                await redis.delete(lock_key)
+        except RedisError as exc:
+            logger.warning(f"Cache unlock failed for {lock_key}: {exc}")
+
+    def _store_local(self, key: str, data: bytes, ttl: Optional[float]) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        self.local.set(key, data, ttl=min(ttl, self.local_ttl))
+
+    async def _store(
+        self, key: str, data: bytes, ttl: Optional[float], tags: Iterable[str]
+    ) -> None:
+        self._store_local(key, data, ttl)
+        ttl_ms = int((self.default_ttl if ttl is None else ttl) * 1000)
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.set(key, data, px=ttl_ms)
+            for tag in tags:
+                tag_key = self._tag_key(tag)
+                pipe.sadd(tag_key, key)
+                # 标签集合的过期时间不短于其中任何缓存键
+                pipe.pexpire(tag_key, ttl_ms, nx=True)
+                pipe.pexpire(tag_key, ttl_ms, gt=True)
+            await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"Cache write failed for {key}: {exc}")
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """
+        删除带有任一标签的缓存
+        """
+        if not tags:
+            return
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            redis = get_redis()
+            pipe = redis.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = await pipe.execute()
+            keys = set().union(*members)
+            await redis.unlink(*keys, *tag_keys)
+            for key in keys:
+                self.local.pop(key.decode())
+            if keys:
+                # 通知其他进程清理L1
+                await redis.publish(self.channel, msgpack.packb(list(keys)))
+        except RedisError as exc:
+            logger.warning(f"Cache invalidation failed for {tags}: {exc}")
+
+    def on_invalidate(
+        self,
+        namespace: str,
+        handler: Callable[[str], Any],
+        clear: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        """
+        注册其他进程内缓存的失效处理函数
+
+        收到 `publish_invalidation(namespace, ...)` 发出的消息时，以对象ID字符串
+        调用 `handler`；订阅（重新）建立时可能漏掉消息，调用 `clear` 清空该缓存。
+        """
+        self._handlers[f"{self.prefix}{namespace}:"] = (handler, clear)
+
+    async def publish_invalidation(self, namespace: str, ids: Iterable[Any]) -> None:
+        """
+        通知所有进程（包括Celery worker发出的通知）使 `namespace` 中的对象失效
+        """
+        keys = [f"{self.prefix}{namespace}:{id}".encode() for id in ids]
+        if keys:
+            await get_redis().publish(self.channel, msgpack.packb(keys))
+
+    def _drop_local(self, key: str) -> None:
+        for prefix, (handler, _) in self._handlers.items():
+            if key.startswith(prefix):
+                handler(key[len(prefix) :])
+                return
+        self.local.pop(key)
+
+    def _clear_local(self) -> None:
+        self.local.clear()
+        for _, clear in self._handlers.values():
+            if clear is not None:
+                clear()
+
+    async def listen_for_invalidations(self, poll_interval: float = 1.0) -> None:
+        """
+        订阅失效消息并清理L1，在应用生命周期内运行
+
+        订阅断开期间可能漏掉消息，因此每次（重新）订阅后清空L1
+        和通过 `on_invalidate` 注册的进程内缓存。
+        """
+        task = asyncio.current_task()
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self._clear_local()
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=poll_interval
+                    )
+                    # 读取超时与取消同时发生时，取消可能被客户端的读取超时吞掉
+                    if task is not None and task.cancelling():
+                        raise asyncio.CancelledError
+                    if message is None:
+                        continue
+                    for key in msgpack.unpackb(message["data"]):
+                        self._drop_local(key.decode())
+            except RedisError as exc:
+                logger.warning(f"Cache invalidation subscription failed: {exc}")
+                self._clear_local()
+                await asyncio.sleep(poll_interval)
+            finally:
+                await pubsub.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回各级缓存的统计信息和命中率
+        """
+        local = self.local.stats()
+        local["hit_ratio"] = _hit_ratio(local["hits"], local["misses"])
+        return {
+            "l1": local,
+            "redis": {
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_ratio": _hit_ratio(self.hits, self.misses),
+            },
+        }
+
+
+def _hit_ratio(hits: int, misses: int) -> Optional[float]:
+    total = hits + misses
+    return hits / total if total else None
+
+
+cache: RedisCache = LazyObject(  # type: ignore[assignment]
+    lambda: RedisCache(
+        prefix=settings.CACHE_KEY_PREFIX,
+        default_ttl=settings.CACHE_DEFAULT_TTL_SECONDS,
+        lock_timeout=settings.CACHE_LOCK_TIMEOUT_SECONDS,
+        local_max_size=settings.CACHE_L1_MAX_SIZE,
+        local_max_bytes=settings.CACHE_L1_MAX_BYTES,
+        local_ttl=settings.CACHE_L1_TTL_SECONDS,
+    )
+)
+
+
+def cached(
+    ttl: Optional[float] = None,
+    tags: Sequence[str] = (),
+    *,
+    namespace: Optional[str] = None,
+    cache_none: bool = False,
+) -> Callable:
+    """
+    缓存异步函数的返回值，可用于路由函数和CRUD读取方法
+
+    **参数**
+    * `ttl`: 过期时间（秒），默认使用 `CACHE_DEFAULT_TTL_SECONDS`
+    * `tags`: 缓存标签，可以使用参数格式化，如 `"user:{id}"`；
+      返回ORM对象时自动打上对象标签 `表名:主键`
+    * `namespace`: 缓存键命名空间，默认为函数的模块和名称
+    * `cache_none`: 是否缓存返回的None
+
+    缓存键由参数生成，数据库会话和请求对象不参与；ORM对象按主键，
+    其他自定义对象可以实现 `__cache_key__()` 方法。
+
+    **注意**：返回ORM对象时缓存的是全部列字段，命中时得到的是重建的detached对象，
+    修改后提交不会写回数据库，也不能加载延迟关系；密码哈希等敏感字段会写入Redis。
+    CRUD读取使用 `CRUDBase.get_cached` 返回schema对象，不要缓存认证查询。
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable:
+        func_signature = signature(func)
+        func_namespace = namespace or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not settings.CACHE_ENABLED:
+                return await func(*args, **kwargs)
+            bound = func_signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return await cache.get_or_set(
+                cache.make_key(func_namespace, bound.arguments),
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                tags=[tag.format(**bound.arguments) for tag in tags],
+                cache_none=cache_none,
+            )
+
+        return wrapper
+
+    return decorator
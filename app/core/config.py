@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Union
 
 from pydantic import AnyHttpUrl, EmailStr, PostgresDsn, RedisDsn, field_validator
@@ -9,6 +10,9 @@ class Settings(BaseSettings):
     PROJECT_NAME: str
     API_V1_STR: str
 
+    # 运行环境，development 下按需生成OpenAPI文档
+    ENVIRONMENT: str = "development"
+
     # 服务器设置
     SERVER_HOST: str
     SERVER_PORT: int
@@ -17,6 +21,29 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # 非对称算法（RS256/ES256等）的密钥目录和当前签名密钥ID
+    JWT_KEYS_DIR: Optional[str] = None
+    JWT_SIGNING_KID: Optional[str] = None
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    # 已撤销会话列表的增量同步间隔
+    TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS: float = 1.0
+
+    # 密码哈希线程池设置
+    PASSWORD_HASH_MAX_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
+    # 进程内后台任务设置
+    JOBS_CONCURRENCY: int = 10
+    JOBS_QUEUE_SIZE: int = 1000
+    JOBS_DRAIN_TIMEOUT_SECONDS: float = 10.0
+
+    # 当前用户缓存设置
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
+    # 已验证令牌缓存设置
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
 
     # CORS设置
     CORS_ORIGINS: List[AnyHttpUrl] = []
@@ -51,6 +78,24 @@ class Settings(BaseSettings):
             path=f"{values.get('POSTGRES_DB') or ''}",
         )
 
+    # 只读副本设置，环境变量中使用JSON列表，如 `["postgresql+asyncpg://..."]`
+    DATABASE_REPLICA_URIS: List[str] = []
+    DB_REPLICA_EJECT_SECONDS: int = 30
+
+    # 数据库连接池设置
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP_CONNECTIONS: int = 0
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+
+    # SQL统计设置
+    DB_QUERY_STATS_ENABLED: bool = False
+    DB_SLOW_QUERY_MS: int = 500
+
     # Redis设置
     REDIS_SERVER: str
     REDIS_PORT: int
@@ -76,12 +121,49 @@ class Settings(BaseSettings):
 
         return f"redis://{auth_part}{redis_server}:{redis_port}/{redis_db}"
 
+    # Redis连接池设置
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+
+    # 缓存设置
+    CACHE_ENABLED: bool = False
+    CACHE_KEY_PREFIX: str = "cache:"
+    CACHE_DEFAULT_TTL_SECONDS: int = 60
+    CACHE_LOCK_TIMEOUT_SECONDS: float = 5.0
+    # 进程内L1缓存设置，通过Redis发布订阅保持一致
+    CACHE_L1_MAX_SIZE: int = 10000
+    CACHE_L1_MAX_BYTES: int = 32 * 1024 * 1024
+    CACHE_L1_TTL_SECONDS: int = 30
+
+    # 限流设置，规则格式为 "次数/周期"，如 "10/minute"，留空表示不限制
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_KEY_PREFIX: str = "ratelimit:"
+    RATE_LIMIT_DEFAULT: str = "600/minute"
+    RATE_LIMIT_GLOBAL: str = ""
+    RATE_LIMIT_LOGIN_PER_IP: str = "20/minute"
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: str = "10/minute"
+    RATE_LIMIT_LOGIN_GLOBAL: str = "1000/minute"
+
     # Celery配置
     CELERY_BROKER_URL: Optional[str] = None
     CELERY_RESULT_BACKEND: Optional[str] = None
     CELERY_TIMEZONE: str
     CELERY_TASK_TRACK_STARTED: bool
     CELERY_TASK_TIME_LIMIT: int
+    # 消息和结果的压缩方式，可选 zstd、gzip、brotli，留空不压缩
+    CELERY_TASK_COMPRESSION: Optional[str] = "zstd"
+    CELERY_RESULT_EXPIRES_SECONDS: int = 3600
+    CELERY_DEFAULT_QUEUE: str = "default"
+    CELERY_QUEUES: List[str] = ["default", "batch"]
+    # 每个队列的worker并发数和预取数量，JSON格式，如 {"default": 4, "batch": 2}
+    CELERY_QUEUE_CONCURRENCY: Dict[str, int] = {"default": 4, "batch": 2}
+    CELERY_QUEUE_PREFETCH: Dict[str, int] = {"default": 4, "batch": 1}
+    # 批量任务：攒够条数或等待时间到达后合并为一次任务执行
+    CELERY_BATCH_MAX_SIZE: int = 100
+    CELERY_BATCH_MAX_WAIT_SECONDS: float = 1.0
+    # 事务性发件箱中继：每批发送的消息数和发件箱为空时的轮询间隔
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 0.5
 
     @field_validator("CELERY_BROKER_URL", "CELERY_RESULT_BACKEND", mode="before")
     def assemble_celery_connection(cls, v: Optional[str], info) -> str:
@@ -105,6 +187,41 @@ class Settings(BaseSettings):
 
         return f"redis://{auth_part}{redis_server}:{redis_port}/{redis_db}"
 
+    # 监控指标设置
+    METRICS_ENABLED: bool = True
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # 日志设置
+    LOG_LEVEL: str = "INFO"
+    # fork出的worker写入 `<名称>.<pid><后缀>`，每个进程只轮转自己的文件
+    LOG_FILE: Optional[str] = None
+    LOG_JSON: bool = False
+    # 环形缓冲区容量，积压超过75%时对WARNING以下的日志抽样，满时丢弃
+    LOG_BUFFER_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 500
+    LOG_FLUSH_INTERVAL_SECONDS: float = 0.2
+    LOG_SAMPLE_RATE: int = 10
+    LOG_FILE_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_FILE_BACKUP_COUNT: int = 7
+
+    # 响应压缩设置
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # 超过该大小的响应体在线程池中压缩，避免阻塞事件循环
+    COMPRESSION_OFFLOAD_SIZE: int = 256 * 1024
+    # 环境变量中使用JSON列表，如 `["application/json","text/html"]`
+    COMPRESSION_CONTENT_TYPES: List[str] = [
+        "application/json",
+        "application/problem+json",
+        "application/javascript",
+        "text/html",
+        "text/plain",
+        "text/css",
+    ]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
     # 初始超级用户配置
     FIRST_SUPERUSER_EMAIL: Optional[EmailStr] = None
     FIRST_SUPERUSER_USERNAME: Optional[str] = None
@@ -118,4 +235,24 @@ class Settings(BaseSettings):
         env_file = ".env"
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """
+    读取并缓存配置，首次访问时才解析环境变量和.env文件
+    """
+    return Settings()
+
+
+class _LazySettings:
+    """
+    配置的惰性代理，导入模块时不解析配置，访问属性时才调用 `get_settings()`
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+
+settings: Settings = _LazySettings()  # type: ignore[assignment]
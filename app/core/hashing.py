@@ -0,0 +1,124 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.metrics import (
+    password_hash_duration_seconds,
+    password_hash_in_flight,
+    password_hash_queue_wait_seconds,
+    password_hash_rejected_total,
+)
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusyError(Exception):
+    """
+    密码哈希线程池已饱和，调用方应返回429
+    """
+
+
+class PasswordHashExecutor:
+    """
+    有界的密码哈希线程池
+
+    bcrypt在C扩展中释放GIL，放入独立线程池后不会阻塞事件循环。
+    排队任务数超过上限时直接拒绝，而不是无限堆积。
+    线程池按进程惰性创建，fork之后会在子进程中重新创建。
+    """
+
+    def __init__(
+        self, max_workers: int, max_queue: int, dummy_hash: Optional[str] = None
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        # 用户不存在时用于等耗时验证的哈希
+        self.dummy_hash = dummy_hash
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        # 只在事件循环线程中修改
+        self._pending = 0
+        # 统计数据在工作线程中写入，需要加锁
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._rejected = 0
+        self._queue_wait_seconds = 0.0
+        self._hash_seconds = 0.0
+        self._max_queue_wait_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        pid = os.getpid()
+        if self._executor is None or self._pid != pid:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+            self._pid = pid
+            self._pending = 0
+        return self._executor
+
+    def _timed_call(self, enqueued_at: float, fn: Callable[..., T], *args: Any) -> T:
+        started_at = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished_at = time.perf_counter()
+            self._record(started_at - enqueued_at, finished_at - started_at)
+
+    def _record(self, queue_wait: float, hash_time: float) -> None:
+        with self._lock:
+            self._completed += 1
+            self._queue_wait_seconds += queue_wait
+            self._hash_seconds += hash_time
+            if queue_wait > self._max_queue_wait_seconds:
+                self._max_queue_wait_seconds = queue_wait
+        password_hash_queue_wait_seconds.observe(queue_wait)
+        password_hash_duration_seconds.observe(hash_time)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        在线程池中执行哈希函数，线程池饱和时抛出PasswordHasherBusyError
+        """
+        executor = self._get_executor()
+        if self._pending >= self.max_workers + self.max_queue:
+            with self._lock:
+                self._rejected += 1
+            password_hash_rejected_total.inc()
+            raise PasswordHasherBusyError("password hashing executor is saturated")
+
+        self._pending += 1
+        password_hash_in_flight.inc()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                executor, self._timed_call, time.perf_counter(), fn, *args
+            )
+        finally:
+            self._pending -= 1
+            password_hash_in_flight.dec()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回线程池统计信息：排队等待时间与哈希耗时分开统计
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "queue_wait_seconds_total": self._queue_wait_seconds,
+                "queue_wait_seconds_max": self._max_queue_wait_seconds,
+                "hash_seconds_total": self._hash_seconds,
+            }
+
+    def shutdown(self) -> None:
+        """
+        关闭线程池
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,291 @@
+import asyncio
+import functools
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import anyio
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import background_job_duration_seconds, background_jobs_total
+from app.utils.lazy import LazyObject
+
+
+class JobQueueFullError(Exception):
+    """
+    后台任务队列已满，且任务没有可以转交的Celery任务
+    """
+
+
+class JobAbandonedError(Exception):
+    """
+    关闭时任务在排空超时前没有完成
+    """
+
+
+@dataclass(frozen=True)
+class JobOptions:
+    """
+    后台任务选项
+
+    * `max_retries`: 出错后的重试次数，重试间隔从 `retry_delay` 开始指数增长
+    * `budget`: 单次执行的最长时间（秒），超时后取消并转交 `fallback`
+    * `fallback`: 使用相同参数执行的Celery任务，在超时、队列已满或关闭时接手
+    """
+
+    max_retries: int = 0
+    retry_delay: float = 0.1
+    budget: Optional[float] = None
+    fallback: Optional[Any] = None
+
+
+@dataclass(eq=False)
+class Job:
+    func: Callable[..., Awaitable[Any]]
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    options: JobOptions
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def name(self) -> str:
+        return f"{self.func.__module__}.{self.func.__qualname__}"
+
+
+DeadLetterHook = Callable[[Job, BaseException], Any]
+
+
+def background_job(
+    *,
+    max_retries: int = 0,
+    retry_delay: float = 0.1,
+    budget: Optional[float] = None,
+    fallback: Optional[Any] = None,
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    为协程函数设置后台任务选项，使用 `job_runner.submit(func, ...)` 提交
+    """
+    options = JobOptions(
+        max_retries=max_retries,
+        retry_delay=retry_delay,
+        budget=budget,
+        fallback=fallback,
+    )
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        func.job_options = options
+        return func
+
+    return decorator
+
+
+class JobRunner:
+    """
+    API进程内的异步后台任务队列
+
+    适合缓存失效、审计日志这类毫秒级的短任务，不需要序列化、经过broker
+    或另一个进程。队列有界，固定数量的worker协程限制并发；
+    出错的任务按指数退避重试，重试耗尽后调用死信钩子。
+    超过执行时间预算的任务会被取消并转交给Celery，因此转交的任务需要是幂等的。
+    关闭时先停止接收新任务并等待队列排空，超时后剩余任务转交Celery或进入死信。
+    """
+
+    def __init__(self, concurrency: int, queue_size: int):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._running: Set[Job] = set()
+        self._handoffs: Set[asyncio.Task] = set()
+        self._dead_letter_hooks: List[DeadLetterHook] = []
+        self._accepting = False
+        self._stats: Dict[str, int] = {
+            "submitted": 0,
+            "succeeded": 0,
+            "retried": 0,
+            "failed": 0,
+            "fallback": 0,
+            "rejected": 0,
+        }
+
+    def on_dead_letter(self, hook: DeadLetterHook) -> DeadLetterHook:
+        """
+        注册死信钩子，可以作为装饰器使用，钩子可以是协程函数
+        """
+        self._dead_letter_hooks.append(hook)
+        return hook
+
+    async def start(self) -> None:
+        """
+        在当前事件循环中启动worker协程
+        """
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        self._accepting = True
+
+    def submit(
+        self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> None:
+        """
+        提交一个后台任务，不等待执行
+
+        队列已满或未运行时，有 `fallback` 的任务转交Celery，
+        否则抛出JobQueueFullError。
+        """
+        options = getattr(func, "job_options", None) or JobOptions()
+        job = Job(func, args, kwargs, options)
+        if self._accepting:
+            try:
+                self._queue.put_nowait(job)
+                self._stats["submitted"] += 1
+                return
+            except asyncio.QueueFull:
+                pass
+        if options.fallback is None:
+            self._record(job, "rejected")
+            raise JobQueueFullError(f"Background job queue is full: {job.name}")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 不在事件循环中（如脚本或Celery worker），直接发送
+            options.fallback.apply_async(args=args, kwargs=kwargs)
+            self._record(job, "fallback")
+            return
+        task = loop.create_task(self._fallback(job))
+        self._handoffs.add(task)
+        task.add_done_callback(self._handoffs.discard)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._running.add(job)
+            try:
+                await self._run(job)
+            except Exception:
+                logger.exception(f"Background job runner error in {job.name}")
+            finally:
+                self._running.discard(job)
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        options = job.options
+        while True:
+            job.attempts += 1
+            started_at = time.perf_counter()
+            # budget为None时不限时；只有预算耗尽才转交，任务自身抛出的超时按普通错误处理
+            deadline = asyncio.timeout(options.budget)
+            try:
+                async with deadline:
+                    await job.func(*job.args, **job.kwargs)
+            except Exception as exc:
+                if deadline.expired() and options.fallback is not None:
+                    logger.warning(
+                        f"Background job {job.name} exceeded its {options.budget}s "
+                        f"budget, handing off to Celery"
+                    )
+                    await self._fallback(job)
+                    return
+                error: Exception = exc
+            else:
+                self._record(job, "succeeded", time.perf_counter() - started_at)
+                return
+
+            if job.attempts <= options.max_retries:
+                self._record(job, "retried")
+                await asyncio.sleep(options.retry_delay * 2 ** (job.attempts - 1))
+                continue
+            await self._dead_letter(job, error)
+            return
+
+    async def _fallback(self, job: Job) -> None:
+        """
+        把任务转交给Celery，发送消息是阻塞调用，在线程中执行
+        """
+        try:
+            await anyio.to_thread.run_sync(
+                functools.partial(
+                    job.options.fallback.apply_async, args=job.args, kwargs=job.kwargs
+                )
+            )
+        except Exception as exc:
+            await self._dead_letter(job, exc)
+            return
+        self._record(job, "fallback")
+
+    async def _dead_letter(self, job: Job, exc: BaseException) -> None:
+        self._record(job, "failed")
+        logger.opt(exception=exc).error(
+            f"Background job {job.name} failed after {job.attempts} attempts"
+        )
+        for hook in self._dead_letter_hooks:
+            try:
+                result = hook(job, exc)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception(f"Dead letter hook failed for {job.name}")
+
+    def _record(self, job: Job, result: str, duration: Optional[float] = None) -> None:
+        self._stats[result] += 1
+        background_jobs_total.labels(job=job.name, result=result).inc()
+        if duration is not None:
+            background_job_duration_seconds.labels(job=job.name).observe(duration)
+
+    async def stop(self, timeout: float) -> None:
+        """
+        停止接收新任务并等待队列排空，超时后取消剩余任务并转交Celery或进入死信
+        """
+        self._accepting = False
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Background jobs not drained within {timeout}s: "
+                f"{self._queue.qsize()} queued, {len(self._running)} running"
+            )
+
+        leftover = list(self._running)
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._running.clear()
+        if self._handoffs:
+            await asyncio.gather(*self._handoffs, return_exceptions=True)
+
+        for job in leftover:
+            if job.options.fallback is not None:
+                await self._fallback(job)
+            else:
+                await self._dead_letter(
+                    job, JobAbandonedError(f"Shut down before {job.name} finished")
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回队列长度、正在执行的任务数和各类结果计数
+        """
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": len(self._running),
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            **self._stats,
+        }
+
+
+job_runner: JobRunner = LazyObject(  # type: ignore[assignment]
+    lambda: JobRunner(
+        concurrency=settings.JOBS_CONCURRENCY, queue_size=settings.JOBS_QUEUE_SIZE
+    )
+)
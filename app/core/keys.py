@@ -0,0 +1,159 @@
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from jose import jwk, jwt
+from jose.backends.base import Key
+
+from app.core.config import settings
+
+# 非对称算法，公钥可以通过JWKS公开
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+
+# 私钥文件为 `<kid>.pem`，只用于验证的旧公钥为 `<kid>.pub.pem`
+_PRIVATE_SUFFIX = ".pem"
+_PUBLIC_SUFFIX = ".pub.pem"
+
+
+class KeyRing:
+    """
+    JWT签名密钥集合
+
+    密钥对象在加载时解析一次并缓存，签名和验证时直接使用，不再重复解析PEM。
+    令牌头部带有 `kid`，验证时按 `kid` 选择密钥，轮换密钥期间旧令牌仍可验证。
+    使用对称算法时只有一个密钥，不公开到JWKS。
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        signing_kid: Optional[str],
+        private_keys: Dict[Optional[str], Key],
+        public_keys: Dict[Optional[str], Key],
+    ):
+        if signing_kid not in private_keys:
+            raise ValueError(f"Signing key {signing_kid!r} not found")
+        self.algorithm = algorithm
+        self.signing_kid = signing_kid
+        self._signing_key = private_keys[signing_kid]
+        self._verify_keys = public_keys
+        self._headers = {"kid": signing_kid} if signing_kid is not None else None
+
+    @classmethod
+    def from_secret(cls, secret: str, algorithm: str) -> "KeyRing":
+        """
+        使用共享密钥（HS256等）
+        """
+        key = jwk.construct(secret, algorithm)
+        return cls(algorithm, None, {None: key}, {None: key})
+
+    @classmethod
+    def from_directory(cls, path: Path, algorithm: str, signing_kid: str) -> "KeyRing":
+        """
+        从目录加载 `<kid>.pem` 私钥和 `<kid>.pub.pem` 公钥
+        """
+        private_keys: Dict[Optional[str], Key] = {}
+        public_keys: Dict[Optional[str], Key] = {}
+        for file in sorted(path.iterdir()):
+            if file.name.endswith(_PUBLIC_SUFFIX):
+                kid = file.name[: -len(_PUBLIC_SUFFIX)]
+                public_keys[kid] = jwk.construct(file.read_text(), algorithm)
+            elif file.name.endswith(_PRIVATE_SUFFIX):
+                kid = file.name[: -len(_PRIVATE_SUFFIX)]
+                private_keys[kid] = jwk.construct(file.read_text(), algorithm)
+                public_keys[kid] = private_keys[kid].public_key()
+        return cls(algorithm, signing_kid, private_keys, public_keys)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        """
+        使用当前密钥签名
+        """
+        return jwt.encode(
+            claims, self._signing_key, algorithm=self.algorithm, headers=self._headers
+        )
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        按令牌头部的 `kid` 选择密钥验证，失败时抛出 `jwt.JWTError`
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._verify_keys.get(kid)
+        if key is None:
+            raise jwt.JWTError(f"Unknown key id: {kid}")
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+    def jwks(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        返回公钥的JWK Set，对称密钥不公开
+        """
+        if self.algorithm not in ASYMMETRIC_ALGORITHMS:
+            return {"keys": []}
+        keys = []
+        for kid, key in self._verify_keys.items():
+            data = key.to_dict()
+            data.update(kid=kid, use="sig", alg=self.algorithm)
+            keys.append(data)
+        return {"keys": keys}
+
+
+def load_key_ring() -> KeyRing:
+    """
+    根据配置加载密钥：非对称算法从 `JWT_KEYS_DIR` 加载，否则使用 `SECRET_KEY`
+    """
+    if settings.ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        if not settings.JWT_KEYS_DIR or not settings.JWT_SIGNING_KID:
+            raise ValueError(
+                f"JWT_KEYS_DIR and JWT_SIGNING_KID are required for {settings.ALGORITHM}"
+            )
+        return KeyRing.from_directory(
+            Path(settings.JWT_KEYS_DIR), settings.ALGORITHM, settings.JWT_SIGNING_KID
+        )
+    return KeyRing.from_secret(settings.SECRET_KEY, settings.ALGORITHM)
+
+
+def generate_private_key_pem(algorithm: str) -> bytes:
+    """
+    生成指定算法的PEM格式私钥
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    if algorithm.startswith("RS"):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm.startswith("ES"):
+        curve = {"ES256": ec.SECP256R1, "ES384": ec.SECP384R1, "ES512": ec.SECP521R1}
+        private_key = ec.generate_private_key(curve[algorithm]())
+    else:
+        raise ValueError(f"Unsupported algorithm: {algorithm}")
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+
+
+def main() -> None:
+    """
+    生成新的签名密钥，用于密钥轮换：
+    python -m app.core.keys --dir keys --kid 2024-06 --algorithm RS256
+
+    生成后把 `JWT_SIGNING_KID` 改为新的kid；旧私钥可以替换为 `<kid>.pub.pem`
+    公钥，保留到旧令牌全部过期。
+    """
+    parser = argparse.ArgumentParser(description="Generate a JWT signing key")
+    parser.add_argument("--dir", type=Path, required=True)
+    parser.add_argument("--kid", required=True)
+    parser.add_argument("--algorithm", default="RS256", choices=ASYMMETRIC_ALGORITHMS)
+    args = parser.parse_args()
+
+    args.dir.mkdir(parents=True, exist_ok=True)
+    path = args.dir / f"{args.kid}{_PRIVATE_SUFFIX}"
+    if path.exists():
+        raise SystemExit(f"{path} already exists")
+    path.write_bytes(generate_private_key_pem(args.algorithm))
+    path.chmod(0o600)
+    print(f"Private key written to {path}")
+
+
+if __name__ == "__main__":
+    main()
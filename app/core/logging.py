@@ -1,32 +1,360 @@
+import atexit
 import logging
+import os
 import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
 
+import orjson
 from loguru import logger
 
+# 缓冲区中的一条日志：
+# (时间戳, 级别名, 级别值, 模块名, 函数名, 行号, 消息, 异常信息, 附加字段)
+# 标准库日志的消息位置保存LogRecord，在写入线程中才格式化消息
+LogEntry = Tuple[
+    float,
+    str,
+    int,
+    str,
+    str,
+    int,
+    Union[str, logging.LogRecord],
+    Any,
+    Optional[Dict[str, Any]],
+]
 
-class InterceptHandler(logging.Handler):
+# 缓冲区使用量超过该比例后开始对WARNING以下的日志抽样
+_HIGH_WATER_RATIO = 0.75
+
+
+class _RotatingFile:
     """
-    将标准库logging输出拦截到loguru
+    按大小轮转的日志文件，只在后台写入线程中使用
+
+    fork出的子进程改写独立的 `<名称>.<pid><后缀>` 文件，
+    每个文件只由一个进程写入和轮转，预加载的多个worker不会互相轮转对方正在写的文件。
     """
 
-    def emit(self, record):
-        # 获取相应的loguru级别
+    def __init__(self, path: Path, max_bytes: int, backup_count: int):
+        self.base_path = path
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._open()
+
+    def _open(self, mode: str = "ab") -> None:
+        self._file = open(self.path, mode)
+        self._size = self._file.tell()
+
+    def reopen_for_child(self) -> None:
+        """
+        在fork出的子进程中切换到本进程独立的日志文件
+        """
+        try:
+            self._file.close()
+        except Exception:
+            pass
+        base = self.base_path
+        self.path = base.with_name(f"{base.stem}.{os.getpid()}{base.suffix}")
+        self._open()
+
+    def write(self, data: bytes) -> None:
+        if self.max_bytes and self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        if self.backup_count <= 0:
+            # 不保留备份时直接清空当前文件
+            self._open("wb")
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                source.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        self._open()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class LogPipeline:
+    """
+    非阻塞的批量日志管道
+
+    记录日志的线程只把日志放入有界的环形缓冲区，格式化、序列化和写入
+    都在后台线程中按批完成，请求热路径上不会等待I/O。
+    缓冲区积压超过高水位时，WARNING以下的日志每 `sample_rate` 条保留一条；
+    缓冲区已满时丢弃WARNING以下的日志，更高级别的日志挤掉最旧的一条。
+    丢弃的条数会在下一批写入时以一条警告日志输出。
+    """
+
+    def __init__(
+        self,
+        *,
+        log_file: Optional[Union[str, Path]] = None,
+        stdout: bool = True,
+        json_logs: bool = False,
+        buffer_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        sample_rate: int = 10,
+        file_max_bytes: int = 10 * 1024 * 1024,
+        file_backup_count: int = 7,
+    ):
+        self.stdout = stdout
+        self.json_logs = json_logs
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_rate = max(1, sample_rate)
+        self.dropped = 0
+        self._high_water = int(buffer_size * _HIGH_WATER_RATIO)
+        self._sampled = 0
+        self._reported_dropped = 0
+        self._buffer: Deque[LogEntry] = deque(maxlen=buffer_size)
+        # fork出的子进程写入各自的 `<名称>.<pid><后缀>` 文件
+        self._file = (
+            _RotatingFile(Path(log_file), file_max_bytes, file_backup_count)
+            if log_file
+            else None
+        )
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._start()
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _after_fork(self) -> None:
+        # fork后子进程中没有写入线程，且父进程缓冲区中的日志由父进程负责写出
+        if self._closed:
+            return
+        self._buffer.clear()
+        self._wakeup = threading.Event()
+        if self._file is not None:
+            self._file.reopen_for_child()
+        self._start()
+
+    def submit(self, entry: LogEntry) -> None:
+        """
+        放入一条日志，不做任何I/O
+        """
+        size = len(self._buffer)
+        if size >= self._high_water and entry[2] < logging.WARNING:
+            if size >= self.buffer_size:
+                self.dropped += 1
+                return
+            self._sampled += 1
+            if self._sampled % self.sample_rate:
+                self.dropped += 1
+                return
+        elif size >= self.buffer_size:
+            # 缓冲区满时deque会挤掉最旧的一条
+            self.dropped += 1
+        self._buffer.append(entry)
+        if size >= self.batch_size and not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def loguru_sink(self, message) -> None:
+        """
+        loguru的sink，loguru只需要生成消息文本，格式化在后台线程完成
+        """
+        record = message.record
+        exception = None
+        if record["exception"] is not None:
+            # 使用loguru已经格式化好的异常信息
+            exception = str(message)[len(record["message"]) + 1 :]
+        self.submit(
+            (
+                record["time"].timestamp(),
+                record["level"].name,
+                record["level"].no,
+                record["name"],
+                record["function"],
+                record["line"],
+                record["message"],
+                exception,
+                record["extra"] or None,
+            )
+        )
+
+    def submit_record(self, record: logging.LogRecord) -> None:
+        """
+        放入一条标准库日志，直接使用记录中的调用位置，不需要回溯调用栈
+
+        消息在写入线程中才用 `msg % args` 格式化，调用方不承担格式化开销。
+        """
+        self.submit(
+            (
+                record.created,
+                record.levelname,
+                record.levelno,
+                record.name,
+                record.funcName,
+                record.lineno,
+                record,
+                record.exc_info,
+                None,
+            )
+        )
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+
+    def _drain(self) -> None:
+        popleft = self._buffer.popleft
+        while self._buffer:
+            batch: List[LogEntry] = []
+            try:
+                for _ in range(self.batch_size):
+                    batch.append(popleft())
+            except IndexError:
+                pass
+            self._write(batch)
+
+        dropped = self.dropped
+        if dropped != self._reported_dropped:
+            self._write(
+                [
+                    (
+                        time.time(),
+                        "WARNING",
+                        logging.WARNING,
+                        __name__,
+                        "_drain",
+                        0,
+                        f"Log buffer full, dropped "
+                        f"{dropped - self._reported_dropped} records",
+                        None,
+                        None,
+                    )
+                ]
+            )
+            self._reported_dropped = dropped
+
+    def _write(self, batch: List[LogEntry]) -> None:
         try:
-            level = logger.level(record.levelname).name
-        except ValueError:
-            level = record.levelno
-
-        # 获取调用信息
-        frame, depth = logging.currentframe(), 2
-        while frame.f_code.co_filename == logging.__file__:
-            frame = frame.f_back
-            depth += 1
-
-        logger.opt(depth=depth, exception=record.exc_info).log(
-            level, record.getMessage()
+            data = b"".join(self._format(entry) for entry in batch)
+            if self.stdout:
+                stream = getattr(sys.stdout, "buffer", None)
+                if stream is not None:
+                    # 先写出文本层中其他代码输出的内容，保持顺序
+                    sys.stdout.flush()
+                    stream.write(data)
+                else:
+                    sys.stdout.write(data.decode())
+                sys.stdout.flush()
+            if self._file is not None:
+                self._file.write(data)
+        except Exception:
+            # 写日志失败时不能再通过日志报告
+            traceback.print_exc(file=sys.__stderr__)
+
+    def _format(self, entry: LogEntry) -> bytes:
+        timestamp, level, _, name, function, line, message, exception, extra = entry
+        if isinstance(message, logging.LogRecord):
+            message = _record_message(message)
+        if exception is not None and not isinstance(exception, str):
+            exception = "".join(traceback.format_exception(*exception))
+        moment = datetime.fromtimestamp(timestamp).astimezone()
+        if self.json_logs:
+            data = {
+                "time": moment,
+                "level": level,
+                "name": name,
+                "function": function,
+                "line": line,
+                "message": message,
+            }
+            if exception:
+                data["exception"] = exception
+            if extra:
+                data["extra"] = extra
+            return orjson.dumps(data, default=str, option=orjson.OPT_APPEND_NEWLINE)
+        text = (
+            f"{moment:%Y-%m-%d %H:%M:%S}.{moment.microsecond // 1000:03d} | "
+            f"{level: <8} | {name}:{function}:{line} - {message}\n"
         )
+        if exception:
+            text += exception if exception.endswith("\n") else exception + "\n"
+        return text.encode()
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        唤醒写入线程并等待缓冲区写空
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._buffer and (deadline is None or time.monotonic() < deadline):
+            self._wakeup.set()
+            time.sleep(0.005)
+
+    def close(self) -> None:
+        """
+        停止写入线程并写出缓冲区中剩余的日志
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+        self._drain()
+        if self._file is not None:
+            self._file.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "buffer_size": self.buffer_size,
+            "dropped": self.dropped,
+        }
+
+
+def _record_message(record: logging.LogRecord) -> str:
+    """
+    格式化标准库日志的消息，参数与格式不匹配时保留原始内容，不影响同批其他日志
+    """
+    try:
+        return record.getMessage()
+    except Exception:
+        return f"{record.msg!r} % {record.args!r}"
+
+
+class InterceptHandler(logging.Handler):
+    """
+    将标准库logging输出拦截到日志管道
+    """
+
+    def __init__(self, pipeline: LogPipeline, level: int = logging.NOTSET):
+        super().__init__(level)
+        self.pipeline = pipeline
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.pipeline.submit_record(record)
+        except Exception:
+            self.handleError(record)
+
+
+log_pipeline: Optional[LogPipeline] = None
 
 
 def setup_logging(
@@ -34,41 +362,67 @@ def setup_logging(
     log_file: Optional[Path] = None,
     json_logs: bool = False,
     log_modules: List[str] = None,
-) -> None:
+    *,
+    buffer_size: int = 10000,
+    batch_size: int = 500,
+    flush_interval: float = 0.2,
+    sample_rate: int = 10,
+    file_max_bytes: int = 10 * 1024 * 1024,
+    file_backup_count: int = 7,
+) -> LogPipeline:
     """
-    配置日志，将标准库logging和第三方库的日志一并定向到loguru
+    配置日志，将loguru、标准库logging和第三方库的日志一并写入日志管道
     """
-    # 移除所有默认的处理器
+    global log_pipeline
+
+    if log_pipeline is not None:
+        log_pipeline.close()
+    log_pipeline = LogPipeline(
+        log_file=log_file,
+        json_logs=json_logs,
+        buffer_size=buffer_size,
+        batch_size=batch_size,
+        flush_interval=flush_interval,
+        sample_rate=sample_rate,
+        file_max_bytes=file_max_bytes,
+        file_backup_count=file_backup_count,
+    )
+    level = logger.level(log_level.upper()).no
+
+    # 移除所有默认的处理器，loguru只生成消息文本，格式化由管道完成
     logger.remove()
-    # 添加标准输出处理器
     logger.add(
-        sys.stdout,
-        enqueue=True,
-        backtrace=True,
-        level=log_level.upper(),
-        format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}",
-        serialize=json_logs,
+        log_pipeline.loguru_sink,
+        level=level,
+        format="{message}",
+        backtrace=False,
+        diagnose=False,
     )
-    # 如果指定了日志文件，则添加文件处理器
-    if log_file:
-        logger.add(
-            log_file,
-            rotation="10 MB",
-            retention="7 days",
-            enqueue=True,
-            backtrace=True,
-            level=log_level.upper(),
-            format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}",
-            serialize=json_logs,
-        )
 
-    # 配置标准库的logging -> loguru
-    logging.basicConfig(handlers=[InterceptHandler()], level=0, force=True)
+    # 配置标准库的logging -> 日志管道
+    handler = InterceptHandler(log_pipeline)
+    logging.basicConfig(handlers=[handler], level=level, force=True)
 
-    # 将所需模块的日志重定向到loguru
-    modules = log_modules or ["uvicorn", "uvicorn.error", "fastapi"]
+    # 将所需模块的日志重定向到日志管道
+    modules = log_modules or ["uvicorn", "uvicorn.error", "uvicorn.access", "fastapi"]
     for module in modules:
-        logging.getLogger(module).handlers = [InterceptHandler()]
+        module_logger = logging.getLogger(module)
+        module_logger.handlers = [handler]
+        module_logger.propagate = False
+
+    return log_pipeline
+
+
+def _after_fork_in_child() -> None:
+    # 只处理当前的日志管道，已被替换或关闭的管道不在子进程中重新打开文件
+    if log_pipeline is not None:
+        log_pipeline._after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
 
-    # 设置默认的logger
-    logger.configure(handlers=[{"sink": sys.stderr, "level": log_level.upper()}])
+@atexit.register
+def _close_log_pipeline() -> None:
+    if log_pipeline is not None:
+        log_pipeline.close()
@@ -0,0 +1,223 @@
+import asyncio
+import os
+from typing import Dict, List, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# 多进程模式下由gunicorn.conf.py设置该环境变量，各worker写入同一目录下的mmap文件
+MULTIPROCESS_ENABLED = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# 请求延迟分桶（秒）
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# HTTP请求指标
+http_requests_total = Counter(
+    "http_requests_total",
+    "Total HTTP requests by method, route and status code",
+    ["method", "route", "status"],
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being processed",
+    multiprocess_mode="livesum",
+)
+
+# 数据库连接池指标
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    buckets=LATENCY_BUCKETS,
+)
+db_pool_checkout_errors_total = Counter(
+    "db_pool_checkout_errors_total",
+    "Connection checkouts that failed or timed out",
+)
+db_pool_connections_in_use = Gauge(
+    "db_pool_connections_in_use",
+    "Connections currently checked out of the pool",
+    multiprocess_mode="livesum",
+)
+
+# 密码哈希线程池指标
+password_hash_queue_wait_seconds = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time password hashing jobs wait for a free executor thread",
+    buckets=LATENCY_BUCKETS,
+)
+password_hash_duration_seconds = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent computing password hashes",
+    buckets=LATENCY_BUCKETS,
+)
+password_hash_rejected_total = Counter(
+    "password_hash_rejected_total",
+    "Password hashing jobs rejected because the executor was saturated",
+)
+password_hash_in_flight = Gauge(
+    "password_hash_in_flight",
+    "Password hashing jobs queued or running",
+    multiprocess_mode="livesum",
+)
+
+# 响应压缩指标
+compression_duration_seconds = Histogram(
+    "http_response_compression_duration_seconds",
+    "Time spent compressing response bodies",
+    ["encoding"],
+    buckets=LATENCY_BUCKETS,
+)
+compression_input_bytes_total = Counter(
+    "http_response_compression_input_bytes_total",
+    "Response bytes before compression",
+    ["encoding"],
+)
+compression_output_bytes_total = Counter(
+    "http_response_compression_output_bytes_total",
+    "Response bytes after compression",
+    ["encoding"],
+)
+compression_ratio = Histogram(
+    "http_response_compression_ratio",
+    "Compressed size divided by original size for buffered responses",
+    ["encoding"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+)
+
+# 缓存指标
+cache_requests_total = Counter(
+    "cache_requests_total",
+    "Cache lookups by tier and result",
+    ["tier", "result"],
+)
+
+# 进程内后台任务指标
+background_jobs_total = Counter(
+    "background_jobs_total",
+    "In-process background jobs by job and result",
+    ["job", "result"],
+)
+background_job_duration_seconds = Histogram(
+    "background_job_duration_seconds",
+    "Duration of successful in-process background jobs",
+    ["job"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# 事务性发件箱中继指标
+outbox_messages_relayed_total = Counter(
+    "outbox_messages_relayed_total",
+    "Outbox messages published to the broker",
+)
+outbox_relay_errors_total = Counter(
+    "outbox_relay_errors_total",
+    "Outbox relay batches that failed and were rolled back",
+)
+outbox_relay_batch_duration_seconds = Histogram(
+    "outbox_relay_batch_duration_seconds",
+    "Time spent locking, publishing and deleting one outbox batch",
+    buckets=LATENCY_BUCKETS,
+)
+outbox_relay_lag_seconds = Histogram(
+    "outbox_relay_lag_seconds",
+    "Time from outbox write to broker publish",
+    buckets=LATENCY_BUCKETS + (30.0, 60.0, 300.0),
+)
+
+
+class RequestMetricsBuffer:
+    """
+    请求指标的进程内缓冲
+
+    热路径上只把耗时追加到普通列表、更新字典中的计数，不加锁也不写mmap；
+    定期或在采集前通过指标的公开接口批量写入Prometheus。只能在事件循环线程中使用。
+    """
+
+    def __init__(self) -> None:
+        # 每个 (method, route) 对应自上次写入以来的请求耗时
+        self._durations: Dict[Tuple[str, str], List[float]] = {}
+        self._counts: Dict[Tuple[str, str, int], int] = {}
+        self.in_progress = 0
+
+    def observe(self, method: str, route: str, status: int, elapsed: float) -> None:
+        """
+        记录一次请求
+        """
+        key = (method, route)
+        durations = self._durations.get(key)
+        if durations is None:
+            durations = self._durations[key] = []
+        durations.append(elapsed)
+
+        count_key = (method, route, status)
+        self._counts[count_key] = self._counts.get(count_key, 0) + 1
+
+    def flush(self) -> None:
+        """
+        把缓冲的增量写入Prometheus指标
+        """
+        durations, counts = self._durations, self._counts
+        self._durations, self._counts = {}, {}
+
+        for (method, route), elapsed in durations.items():
+            observe = http_request_duration_seconds.labels(method, route).observe
+            for value in elapsed:
+                observe(value)
+        for (method, route, status), count in counts.items():
+            http_requests_total.labels(method, route, str(status)).inc(count)
+        http_requests_in_progress.set(self.in_progress)
+
+
+# 当前进程的请求指标缓冲
+request_metrics = RequestMetricsBuffer()
+
+
+async def flush_metrics_periodically(interval: float) -> None:
+    """
+    定期把请求指标缓冲写入Prometheus指标，在应用生命周期内运行
+    """
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            request_metrics.flush()
+    finally:
+        request_metrics.flush()
+
+
+def render_latest() -> "tuple[bytes, str]":
+    """
+    生成Prometheus文本格式的指标，多进程模式下汇总所有worker的数据
+    """
+    request_metrics.flush()
+    if MULTIPROCESS_ENABLED:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
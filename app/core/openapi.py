@@ -0,0 +1,101 @@
+import argparse
+import gzip
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import FastAPI, Request, Response
+
+from app.utils.http import choose_encoding
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli为可选依赖
+    brotli = None
+
+
+class PrerenderedOpenAPI:
+    """
+    预渲染的OpenAPI文档
+
+    保存JSON原文及其gzip/br压缩版本，按Accept-Encoding直接返回对应的bytes，
+    并支持ETag条件请求。
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        gzip_body: Optional[bytes] = None,
+        br_body: Optional[bytes] = None,
+    ):
+        self.body = body
+        self.gzip_body = gzip_body if gzip_body is not None else gzip.compress(body, 9)
+        if br_body is None and brotli is not None:
+            br_body = brotli.compress(body, quality=11)
+        self.br_body = br_body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    @classmethod
+    def from_schema(cls, schema: Dict[str, Any]) -> "PrerenderedOpenAPI":
+        """
+        从OpenAPI字典生成
+        """
+        return cls(orjson.dumps(schema))
+
+    def write(self, path: Path) -> None:
+        """
+        写入JSON文件及其压缩版本
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(self.body)
+        path.with_name(path.name + ".gz").write_bytes(self.gzip_body)
+        if self.br_body is not None:
+            path.with_name(path.name + ".br").write_bytes(self.br_body)
+
+    def response(self, request: Request) -> Response:
+        """
+        根据请求头返回304或对应编码的文档
+        """
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=headers)
+
+        encoding = choose_encoding(
+            request.headers.get("accept-encoding", ""),
+            ("br", "gzip") if self.br_body is not None else ("gzip",),
+        )
+        body = self.body
+        if encoding == "br":
+            body = self.br_body
+            headers["Content-Encoding"] = "br"
+        elif encoding == "gzip":
+            body = self.gzip_body
+            headers["Content-Encoding"] = "gzip"
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+def main() -> None:
+    """
+    导出OpenAPI文档，供客户端代码生成或静态托管使用，需要运行时的配置：
+    python -m app.core.openapi --output openapi.json
+
+    应用自身不读取导出的文件，文档在启动时根据当前代码生成，不会返回过期的文档。
+    """
+    parser = argparse.ArgumentParser(description="Export the OpenAPI schema")
+    parser.add_argument("--output", type=Path, default=Path("openapi.json"))
+    args = parser.parse_args()
+
+    from app.main import app
+
+    document = PrerenderedOpenAPI.from_schema(app.openapi())
+    document.write(args.output)
+    print(f"OpenAPI schema written to {args.output} ({len(document.body)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
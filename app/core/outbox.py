@@ -0,0 +1,36 @@
+from typing import Any, Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import dumps
+from app.models.outbox import OutboxMessage
+
+
+def add_to_outbox(
+    db: AsyncSession,
+    task: Union[str, Any],
+    *args: Any,
+    queue: Optional[str] = None,
+    **kwargs: Any,
+) -> OutboxMessage:
+    """
+    把Celery任务写入事务性发件箱
+
+    消息只加入会话，随会话的下一次提交与业务数据一起写入，
+    因此要在调用CRUD写操作之前添加。请求中不访问broker，
+    进程在提交后崩溃也不会丢失任务；由中继进程 `python -m app.tasks.outbox`
+    发送到broker，至少发送一次，任务需要是幂等的。
+    **参数**
+    * `task`: Celery任务对象或任务名
+    * `queue`: 目标队列，默认使用任务的队列或路由配置
+    """
+    if isinstance(task, str):
+        task_name = task
+    else:
+        task_name = task.name
+        queue = queue or getattr(task, "queue", None)
+    message = OutboxMessage(
+        task_name=task_name, queue=queue, payload=dumps([list(args), kwargs])
+    )
+    db.add(message)
+    return message
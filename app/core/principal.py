@@ -0,0 +1,79 @@
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from loguru import logger
+from redis.exceptions import RedisError
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.user import User
+from app.utils.lazy import LazyObject
+from app.utils.lru import LRUCache
+
+# 缓存的用户字段，不包含密码哈希
+_USER_COLUMNS = tuple(
+    attr.key for attr in inspect(User).column_attrs if attr.key != "hashed_password"
+)
+
+# 失效通知的命名空间
+_NAMESPACE = "principal"
+
+
+def _drop_principal(user_id: str) -> None:
+    principal_cache.pop(UUID(user_id))
+
+
+def _create_principal_cache() -> LRUCache[UUID, Dict[str, Any]]:
+    """
+    创建当前用户缓存，并订阅其他进程发出的失效通知
+    """
+    snapshots: LRUCache[UUID, Dict[str, Any]] = LRUCache(
+        maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+        ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    )
+    cache.on_invalidate(_NAMESPACE, _drop_principal, clear=snapshots.clear)
+    return snapshots
+
+
+# 当前用户缓存，按用户ID保存用户字段快照
+principal_cache: LRUCache[UUID, Dict[str, Any]] = LazyObject(  # type: ignore[assignment]
+    _create_principal_cache
+)
+
+
+def cache_principal(user: User) -> None:
+    """
+    缓存用户字段快照
+    """
+    principal_cache.set(user.id, {key: getattr(user, key) for key in _USER_COLUMNS})
+
+
+def get_cached_principal(user_id: UUID) -> Optional[User]:
+    """
+    从缓存中构建用户对象，未命中时返回None
+
+    返回的对象处于detached状态，可以直接交给CRUD层更新；
+    快照中没有密码哈希，需要验证密码时从数据库重新读取用户。
+    """
+    values = principal_cache.get(user_id)
+    if values is None:
+        return None
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+async def invalidate_principal(*user_ids: UUID) -> None:
+    """
+    使缓存的用户失效，并通过Redis发布订阅通知其他进程
+
+    Redis不可用时只清理当前进程，其他进程的缓存在TTL后过期。
+    """
+    for user_id in user_ids:
+        principal_cache.pop(user_id)
+    try:
+        await cache.publish_invalidation(_NAMESPACE, user_ids)
+    except RedisError as exc:
+        logger.warning(f"Principal invalidation broadcast failed: {exc}")
@@ -0,0 +1,203 @@
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from redis.exceptions import RedisError
+from starlette.types import Scope
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.utils.lazy import LazyObject
+from app.utils.lru import LRUCache
+
+# 限流周期名称对应的秒数
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_RATE_LIMIT_PATTERN = re.compile(
+    r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$"
+)
+
+# 令牌桶脚本：所有桶都有足够令牌时才同时扣减，保证多个维度的限流是原子的
+# KEYS: 各个桶的键
+# ARGV: 每个桶依次为 容量、每毫秒补充的令牌数
+# 返回: {是否允许, 最少剩余令牌数, 需要等待的毫秒数}
+_TOKEN_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tokens = {}
+local allowed = 1
+local remaining = -1
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    available = math.min(capacity, available + math.max(0, now - ts) * rate)
+    tokens[i] = available
+    if available < 1 then
+        allowed = 0
+        retry_after = math.max(retry_after, math.ceil((1 - available) / rate))
+    end
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local available = tokens[i]
+    if allowed == 1 then
+        available = available - 1
+    end
+    if remaining < 0 or available < remaining then
+        remaining = available
+    end
+    redis.call('HSET', key, 'tokens', tostring(available), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate))
+end
+return {allowed, math.floor(remaining), retry_after}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    限流规则：每个周期内最多 `limit` 次请求，按令牌桶平滑补充
+    """
+
+    limit: int
+    period: int
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["RateLimit"]:
+        """
+        解析 `"10/minute"`、`"100/10second"` 格式的规则，空字符串表示不限流
+        """
+        if not value.strip():
+            return None
+        match = _RATE_LIMIT_PATTERN.match(value)
+        if match is None:
+            raise ValueError(f"Invalid rate limit: {value}")
+        limit, multiplier, unit = match.groups()
+        return cls(limit=int(limit), period=int(multiplier or 1) * _PERIODS[unit])
+
+    @property
+    def rate_per_ms(self) -> float:
+        return self.limit / (self.period * 1000)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+class RateLimiter:
+    """
+    分布式令牌桶限流器
+
+    一次调用检查多个维度（如IP、账号、全局），通过Lua脚本在Redis中原子执行。
+    Redis不可用时退化为进程内限流，并在一段时间内不再访问Redis，
+    避免每个请求都承担连接超时。
+    """
+
+    def __init__(
+        self, prefix: str, local_max_size: int = 100000, redis_retry_seconds: float = 5
+    ):
+        self.prefix = prefix
+        self.redis_retry_seconds = redis_retry_seconds
+        self._redis_retry_at = 0.0
+        self._script = None
+        self._script_client = None
+        # 进程内令牌桶：键 -> (令牌数, 更新时间)
+        self._local: LRUCache[str, Tuple[float, float]] = LRUCache(
+            maxsize=local_max_size
+        )
+
+    async def hit(self, limits: Sequence[Tuple[str, RateLimit]]) -> RateLimitResult:
+        """
+        对每个 `(键, 规则)` 消耗一个令牌，任一维度超限时都不扣减并返回拒绝
+        """
+        if not limits:
+            return RateLimitResult(allowed=True, remaining=-1, retry_after=0)
+        if time.monotonic() >= self._redis_retry_at:
+            try:
+                return await self._hit_redis(limits)
+            except RedisError as exc:
+                logger.warning(f"Rate limiter falling back to local buckets: {exc}")
+                self._redis_retry_at = time.monotonic() + self.redis_retry_seconds
+        return self._hit_local(limits)
+
+    async def _hit_redis(
+        self, limits: Sequence[Tuple[str, RateLimit]]
+    ) -> RateLimitResult:
+        redis = get_redis()
+        if self._script is None or self._script_client is not redis:
+            self._script = redis.register_script(_TOKEN_BUCKET_SCRIPT)
+            self._script_client = redis
+        args: List[float] = []
+        for _, rule in limits:
+            args.extend((rule.limit, rule.rate_per_ms))
+        allowed, remaining, retry_after_ms = await self._script(
+            keys=[f"{self.prefix}{key}" for key, _ in limits], args=args
+        )
+        return RateLimitResult(
+            allowed=bool(allowed),
+            remaining=int(remaining),
+            retry_after=int(retry_after_ms) / 1000,
+        )
+
+    def _hit_local(self, limits: Sequence[Tuple[str, RateLimit]]) -> RateLimitResult:
+        now = time.monotonic()
+        buckets = []
+        allowed = True
+        retry_after = 0.0
+        for key, rule in limits:
+            tokens, updated_at = self._local.get(key) or (rule.limit, now)
+            tokens = min(
+                rule.limit, tokens + (now - updated_at) * rule.limit / rule.period
+            )
+            buckets.append((key, rule, tokens))
+            if tokens < 1:
+                allowed = False
+                retry_after = max(retry_after, (1 - tokens) * rule.period / rule.limit)
+
+        remaining = None
+        for key, rule, tokens in buckets:
+            if allowed:
+                tokens -= 1
+            self._local.set(key, (tokens, now), ttl=rule.period)
+            remaining = tokens if remaining is None else min(remaining, tokens)
+        return RateLimitResult(
+            allowed=allowed,
+            remaining=math.floor(remaining),
+            retry_after=math.ceil(retry_after * 1000) / 1000,
+        )
+
+
+def client_ip(scope: Scope) -> str:
+    """
+    返回客户端IP，部署在代理后时需要由服务器根据转发头设置
+    """
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def rate_limit_headers(rule: RateLimit, result: RateLimitResult) -> Dict[str, str]:
+    """
+    生成限流响应头
+    """
+    headers = {
+        "X-RateLimit-Limit": str(rule.limit),
+        "X-RateLimit-Remaining": str(max(result.remaining, 0)),
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(result.retry_after)))
+    return headers
+
+
+rate_limiter: RateLimiter = LazyObject(  # type: ignore[assignment]
+    lambda: RateLimiter(prefix=settings.RATE_LIMIT_KEY_PREFIX)
+)
@@ -0,0 +1,49 @@
+import os
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+_client: Optional[Redis] = None
+_client_pid: Optional[int] = None
+
+
+def get_redis() -> Redis:
+    """
+    获取当前进程的Redis客户端
+
+    客户端使用连接池，在首次使用时创建；fork后的子进程会重新创建，
+    不与父进程共享连接。
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        _client = Redis.from_url(
+            str(settings.REDIS_URI),
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            health_check_interval=30,
+        )
+        _client_pid = os.getpid()
+    return _client
+
+
+def set_redis(client: Optional[Redis]) -> None:
+    """
+    替换当前进程的Redis客户端，可传入 `fakeredis.aioredis.FakeRedis` 用于测试
+    """
+    global _client, _client_pid
+    _client = client
+    _client_pid = os.getpid() if client is not None else None
+
+
+async def close_redis() -> None:
+    """
+    关闭当前进程的Redis连接池
+    """
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        await _client.aclose()
+    _client = None
+    _client_pid = None
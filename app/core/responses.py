@@ -0,0 +1,23 @@
+from typing import Any
+
+import orjson
+import pydantic_core
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    高性能JSON响应
+
+    Pydantic模型（及其列表）直接由pydantic-core序列化为bytes，
+    其他内容使用orjson序列化，两者都原生支持datetime和UUID。
+    端点直接返回该响应时会跳过FastAPI的jsonable_encoder。
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel) or (
+            isinstance(content, list) and content and isinstance(content[0], BaseModel)
+        ):
+            return pydantic_core.to_json(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.utils.lazy import LazyObject
+
+# 每次增量同步读取的最大条目数
+_SYNC_BATCH_SIZE = 1000
+
+
+class RevocationList:
+    """
+    已撤销的登录会话列表
+
+    撤销记录写入Redis Stream，每个worker在内存中保存一份快照并按Stream ID
+    增量同步，请求热路径上只做一次字典查找，不访问Redis或数据库。
+    撤销记录只需保留到该会话最后一个访问令牌过期为止，Stream按时间裁剪。
+
+    刷新令牌按会话轮换：Redis中保存每个会话当前有效的刷新令牌ID，
+    旧的刷新令牌被再次使用时视为泄露，整个会话被撤销。
+    """
+
+    def __init__(self, prefix: str, retention_seconds: float):
+        self.stream = f"{prefix}revoked"
+        self.session_prefix = f"{prefix}session:"
+        self.retention_seconds = retention_seconds
+        # 会话ID -> 撤销记录的过期时间
+        self._revoked: Dict[str, float] = {}
+        self._last_id = "0-0"
+        self._next_prune = 0.0
+
+    def is_revoked(self, session_id: Optional[str]) -> bool:
+        """
+        检查会话是否已撤销，只查询本地快照
+        """
+        return session_id is not None and session_id in self._revoked
+
+    async def revoke(self, session_id: str) -> None:
+        """
+        撤销会话：会话的刷新令牌立即失效，访问令牌在各worker同步后失效
+        """
+        expires_at = time.time() + self.retention_seconds
+        self._revoked[session_id] = expires_at
+        min_id = f"{int((time.time() - self.retention_seconds) * 1000)}-0"
+        redis = get_redis()
+        await redis.xadd(
+            self.stream,
+            {"sid": session_id, "exp": str(int(expires_at))},
+            minid=min_id,
+            approximate=True,
+        )
+        await redis.delete(self._session_key(session_id))
+
+    async def sync(self) -> None:
+        """
+        从Redis增量同步撤销记录，首次同步时读取全部未过期记录
+        """
+        redis = get_redis()
+        while True:
+            entries = await redis.xrange(
+                self.stream, min=f"({self._last_id}", count=_SYNC_BATCH_SIZE
+            )
+            for entry_id, fields in entries:
+                self._revoked[fields[b"sid"].decode()] = float(fields[b"exp"])
+                self._last_id = entry_id.decode()
+            if len(entries) < _SYNC_BATCH_SIZE:
+                break
+
+        now = time.time()
+        if now >= self._next_prune:
+            self._revoked = {
+                sid: expires_at
+                for sid, expires_at in self._revoked.items()
+                if expires_at > now
+            }
+            self._next_prune = now + 60
+
+    async def sync_periodically(self, interval: float) -> None:
+        """
+        定期增量同步，在应用生命周期内运行；Redis不可用时保留现有快照并退避重试
+        """
+        delay = interval
+        while True:
+            try:
+                await self.sync()
+                delay = interval
+            except RedisError as exc:
+                logger.warning(f"Token revocation sync failed: {exc}")
+                delay = min(delay * 2, 30)
+            await asyncio.sleep(delay)
+
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.session_prefix}{session_id}"
+
+    async def start_session(
+        self, session_id: str, token_id: str, ttl_seconds: int
+    ) -> None:
+        """
+        记录新会话当前有效的刷新令牌ID
+        """
+        await get_redis().set(self._session_key(session_id), token_id, ex=ttl_seconds)
+
+    async def rotate_session(
+        self, session_id: str, token_id: str, new_token_id: str, ttl_seconds: int
+    ) -> bool:
+        """
+        轮换刷新令牌，`token_id` 不是会话当前的刷新令牌时撤销会话并返回False
+        """
+        current = await get_redis().set(
+            self._session_key(session_id),
+            new_token_id,
+            ex=ttl_seconds,
+            xx=True,
+            get=True,
+        )
+        if current is None:
+            # 会话已过期或已撤销
+            return False
+        if current.decode() != token_id:
+            # 旧的刷新令牌被重复使用，可能已泄露
+            logger.warning(f"Refresh token reuse detected for session {session_id}")
+            await self.revoke(session_id)
+            return False
+        return True
+
+
+revocation_list: RevocationList = LazyObject(  # type: ignore[assignment]
+    lambda: RevocationList(
+        prefix="auth:",
+        retention_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+)
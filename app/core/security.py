@@ -1,3 +1,6 @@
+import hashlib
+import sys
+import time
 import uuid
 from datetime import UTC, datetime, timedelta
 from typing import Any, Optional, Union
@@ -6,16 +9,69 @@ from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.hashing import PasswordHashExecutor
+from app.core.keys import KeyRing, load_key_ring
+from app.schemas.user import TokenPayload
+from app.utils.lazy import LazyObject
+from app.utils.lru import LRUCache
+
+# JWT签名密钥，首次使用时解析一次，应用启动时会主动加载
+key_ring: KeyRing = LazyObject(load_key_ring)  # type: ignore[assignment]
 
 # 密码上下文
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+def _create_password_hasher() -> PasswordHashExecutor:
+    """
+    创建密码哈希线程池，同时生成一次用于等耗时验证的哈希
+    """
+    return PasswordHashExecutor(
+        max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+        max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+        dummy_hash=pwd_context.hash(uuid.uuid4().hex),
+    )
+
+
+# 密码哈希线程池，避免bcrypt阻塞事件循环，应用启动时会主动创建
+password_hasher: PasswordHashExecutor = LazyObject(  # type: ignore[assignment]
+    _create_password_hasher
+)
+
+
+def _token_cache_entry_size(key: bytes, payload: TokenPayload) -> int:
+    """
+    估算令牌缓存条目占用的内存
+    """
+    return (
+        sys.getsizeof(key)
+        + sys.getsizeof(payload)
+        + sum(sys.getsizeof(v) for v in payload.__dict__.values())
+    )
+
+
+# 已验证令牌缓存，按令牌摘要保存解析后的载荷，直到令牌过期
+token_cache: LRUCache[bytes, TokenPayload] = LazyObject(  # type: ignore[assignment]
+    lambda: LRUCache(
+        maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+        max_bytes=settings.TOKEN_CACHE_MAX_BYTES,
+        sizeof=_token_cache_entry_size,
+    )
+)
+
+
+# 令牌类型
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+
 def create_access_token(
-    subject: Union[str, uuid.UUID, Any], expires_delta: Optional[timedelta] = None
+    subject: Union[str, uuid.UUID, Any],
+    expires_delta: Optional[timedelta] = None,
+    session_id: Optional[str] = None,
 ) -> str:
     """
-    创建访问令牌
+    创建访问令牌，`session_id` 为所属登录会话，用于撤销
     """
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
@@ -23,11 +79,65 @@ def create_access_token(
         expire = datetime.now(UTC) + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
+    to_encode = {"exp": expire, "sub": str(subject), "type": ACCESS_TOKEN_TYPE}
+    if session_id is not None:
+        to_encode["sid"] = session_id
+    return key_ring.encode(to_encode)
+
+
+def create_refresh_token(
+    subject: Union[str, uuid.UUID, Any],
+    session_id: str,
+    token_id: str,
+    expires_delta: Optional[timedelta] = None,
+) -> str:
+    """
+    创建刷新令牌，每次刷新都会换发新的 `token_id`
+    """
+    if expires_delta is None:
+        expires_delta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {
+        "exp": datetime.now(UTC) + expires_delta,
+        "sub": str(subject),
+        "type": REFRESH_TOKEN_TYPE,
+        "sid": session_id,
+        "jti": token_id,
+    }
+    return key_ring.encode(to_encode)
+
+
+def decode_access_token(token: str) -> TokenPayload:
+    """
+    解析并验证访问令牌
+
+    验证通过的令牌按摘要缓存到过期为止，同一令牌再次出现时跳过签名验证。
+    验证失败时抛出 `jwt.JWTError` 或 `ValidationError`。
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(key)
+    if token_data is not None:
+        if token_data.exp is None or token_data.exp > time.time():
+            return token_data
+        token_cache.pop(key)
+
+    payload = key_ring.decode(token)
+    token_data = TokenPayload(**payload)
+    if token_data.type not in (None, ACCESS_TOKEN_TYPE):
+        raise jwt.JWTError("Not an access token")
+    if token_data.exp is not None:
+        token_cache.set(key, token_data, ttl=token_data.exp - time.time())
+    return token_data
+
+
+def decode_refresh_token(token: str) -> TokenPayload:
+    """
+    解析并验证刷新令牌，验证失败时抛出 `jwt.JWTError` 或 `ValidationError`
+    """
+    payload = key_ring.decode(token)
+    token_data = TokenPayload(**payload)
+    if token_data.type != REFRESH_TOKEN_TYPE or not token_data.sid:
+        raise jwt.JWTError("Not a refresh token")
+    return token_data
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -42,3 +152,26 @@ def get_password_hash(password: str) -> str:
     获取密码哈希
     """
     return pwd_context.hash(password)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    在密码哈希线程池中验证密码
+    """
+    return await password_hasher.run(
+        pwd_context.verify, plain_password, hashed_password
+    )
+
+
+async def aget_password_hash(password: str) -> str:
+    """
+    在密码哈希线程池中获取密码哈希
+    """
+    return await password_hasher.run(pwd_context.hash, password)
+
+
+async def averify_dummy_password(plain_password: str) -> None:
+    """
+    用户不存在时执行一次等耗时的密码验证，避免通过响应时间探测用户是否存在
+    """
+    await averify_password(plain_password, password_hasher.dummy_hash)
@@ -1,25 +1,67 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import delete, insert, inspect, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.cache import cache, entity_tag
+from app.core.config import settings
 from app.db.base_class import Base
+from app.utils.pagination import CURSOR_NEXT, CURSOR_PREV, decode_cursor, encode_cursor
+
+# 批量操作每个事务处理的行数
+DEFAULT_CHUNK_SIZE = 500
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
+ReadSchemaType = TypeVar("ReadSchemaType", bound=BaseModel)
 
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: Type[ModelType]):
+    def __init__(
+        self, model: Type[ModelType], *, sort_keys: Optional[Sequence[str]] = None
+    ):
         """
         CRUD基类，基本数据库操作
         **参数**
         * `model`: SQLAlchemy模型类
+        * `sort_keys`: 游标分页使用的排序键，需要有索引且组合唯一，
+          默认为 `(created_at, id)`，模型没有 `created_at` 时为 `(id,)`
         """
         self.model = model
+        if sort_keys is None:
+            sort_keys = (
+                ("created_at", "id") if hasattr(model, "created_at") else ("id",)
+            )
+        self.sort_keys = tuple(sort_keys)
+        # 模型的列名，只在初始化时解析一次
+        self.columns = frozenset(attr.key for attr in inspect(model).column_attrs)
+
+    def __cache_key__(self) -> str:
+        return self.model.__tablename__
+
+    async def _invalidate_cache(self, ids: Iterable[Any] = ()) -> None:
+        """
+        写操作提交后使缓存失效：表标签和被修改对象的标签
+        """
+        if not settings.CACHE_ENABLED:
+            return
+        table = self.model.__tablename__
+        await cache.invalidate_tags(table, *(entity_tag(table, id) for id in ids))
 
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         """
@@ -28,6 +70,35 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(select(self.model).filter(self.model.id == id))
         return result.scalars().first()
 
+    async def get_cached(
+        self, db: AsyncSession, id: Any, *, schema: Type[ReadSchemaType]
+    ) -> Optional[ReadSchemaType]:
+        """
+        根据ID获取对象并转换为 `schema`，结果经过缓存
+
+        返回的是Pydantic对象而不是ORM对象，缓存中只保存 `schema` 的字段，
+        不要在 `schema` 中包含密码哈希等敏感字段；需要修改对象时使用 `get`。
+        对象被CRUD写操作修改后缓存随对象标签失效。
+        """
+        if not settings.CACHE_ENABLED:
+            obj = await self.get(db, id)
+            return None if obj is None else schema.model_validate(obj)
+
+        async def compute() -> Optional[Dict[str, Any]]:
+            obj = await self.get(db, id)
+            return None if obj is None else schema.model_validate(obj).model_dump()
+
+        table = self.model.__tablename__
+        values = await cache.get_or_set(
+            cache.make_key(
+                f"{table}.get_cached",
+                {"id": id, "schema": f"{schema.__module__}.{schema.__qualname__}"},
+            ),
+            compute,
+            tags=[entity_tag(table, id)],
+        )
+        return None if values is None else schema.model_validate(values)
+
     async def get_multi(
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> List[ModelType]:
@@ -37,15 +108,74 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(select(self.model).offset(skip).limit(limit))
         return result.scalars().all()
 
+    async def get_page(
+        self, db: AsyncSession, *, cursor: Optional[str] = None, limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        游标分页获取多个对象
+
+        按排序键做键集分页，深分页时不需要像OFFSET一样扫描跳过的行。
+        返回的字典可以直接作为 `Page` 响应模型，游标无效时抛出ValueError。
+        """
+        columns = [getattr(self.model, key) for key in self.sort_keys]
+        direction, values = CURSOR_NEXT, None
+        if cursor:
+            direction, values = decode_cursor(cursor)
+            if len(values) != len(columns):
+                raise ValueError(f"Invalid cursor: {cursor}")
+
+        query = select(self.model)
+        if direction == CURSOR_PREV:
+            if values is not None:
+                query = query.filter(tuple_(*columns) < tuple_(*values))
+            query = query.order_by(*(column.desc() for column in columns))
+        else:
+            if values is not None:
+                query = query.filter(tuple_(*columns) > tuple_(*values))
+            query = query.order_by(*columns)
+
+        # 多取一条用于判断是否还有更多数据
+        result = await db.execute(query.limit(limit + 1))
+        items = list(result.scalars().all())
+        has_more = len(items) > limit
+        items = items[:limit]
+        if direction == CURSOR_PREV:
+            items.reverse()
+
+        next_cursor = prev_cursor = None
+        if items:
+            first = [getattr(items[0], key) for key in self.sort_keys]
+            last = [getattr(items[-1], key) for key in self.sort_keys]
+            if direction == CURSOR_PREV:
+                next_cursor = encode_cursor(CURSOR_NEXT, last)
+                if has_more:
+                    prev_cursor = encode_cursor(CURSOR_PREV, first)
+            else:
+                if has_more:
+                    next_cursor = encode_cursor(CURSOR_NEXT, last)
+                if values is not None:
+                    prev_cursor = encode_cursor(CURSOR_PREV, first)
+
+        return {"items": items, "next_cursor": next_cursor, "prev_cursor": prev_cursor}
+
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         """
         创建对象
         """
         obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
+        return await self._insert(db, obj_in_data)
+
+    async def _insert(self, db: AsyncSession, values: Dict[str, Any]) -> ModelType:
+        """
+        执行一条 `INSERT ... RETURNING`，服务端生成的字段随插入一并返回
+        """
+        values = {k: v for k, v in values.items() if k in self.columns}
+        result = await db.scalars(
+            insert(self.model).values(**values).returning(self.model)
+        )
+        db_obj = result.one()
         await db.commit()
-        await db.refresh(db_obj)
+        await self._invalidate_cache()
         return db_obj
 
     async def update(
@@ -57,26 +187,150 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> ModelType:
         """
         更新对象
+        执行一条 `UPDATE ... RETURNING`，并把返回的字段写回 `db_obj`
         """
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
+        values = {k: v for k, v in update_data.items() if k in self.columns}
+        if not values:
+            return db_obj
+
+        result = await db.scalars(
+            update(self.model)
+            .where(self.model.id == db_obj.id)
+            .values(**values)
+            .returning(self.model)
+        )
+        updated = result.one()
         await db.commit()
-        await db.refresh(db_obj)
+        await self._invalidate_cache([db_obj.id])
+        if updated is not db_obj:
+            for key in self.columns:
+                set_committed_value(db_obj, key, getattr(updated, key))
         return db_obj
 
+    async def create_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[ModelType]:
+        """
+        批量创建对象
+        每个分块执行一条多行 `INSERT ... RETURNING` 并单独提交事务
+        """
+        rows = [
+            {
+                key: value
+                for key, value in (
+                    obj_in if isinstance(obj_in, dict) else jsonable_encoder(obj_in)
+                ).items()
+                if key in self.columns
+            }
+            for obj_in in objs_in
+        ]
+        created: List[ModelType] = []
+        for start in range(0, len(rows), chunk_size):
+            result = await db.scalars(
+                insert(self.model).returning(self.model),
+                rows[start : start + chunk_size],
+            )
+            created.extend(result.all())
+            await db.commit()
+        await self._invalidate_cache()
+        return created
+
+    async def update_many(
+        self,
+        db: AsyncSession,
+        *,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        ids: Optional[Sequence[Any]] = None,
+        where: Optional[Sequence[Any]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[Any]:
+        """
+        批量更新对象，返回被更新对象的ID
+        按 `ids` 更新时分块执行 `UPDATE ... WHERE id IN (...)`，
+        按 `where` 条件更新时执行一条语句
+        """
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        values = {k: v for k, v in update_data.items() if k in self.columns}
+        if not values:
+            return []
+
+        updated: List[Any] = []
+        for clause in self._bulk_where(ids, where, chunk_size):
+            result = await db.execute(
+                update(self.model)
+                .where(*clause)
+                .values(**values)
+                .returning(self.model.id)
+            )
+            chunk = result.scalars().all()
+            await db.commit()
+            await self._invalidate_cache(chunk)
+            updated.extend(chunk)
+        return updated
+
+    async def remove_many(
+        self,
+        db: AsyncSession,
+        *,
+        ids: Optional[Sequence[Any]] = None,
+        where: Optional[Sequence[Any]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[Any]:
+        """
+        批量删除对象，返回被删除对象的ID
+        按 `ids` 删除时分块执行 `DELETE ... RETURNING`，
+        按 `where` 条件删除时执行一条语句
+        """
+        removed: List[Any] = []
+        for clause in self._bulk_where(ids, where, chunk_size):
+            result = await db.execute(
+                delete(self.model).where(*clause).returning(self.model.id)
+            )
+            chunk = result.scalars().all()
+            await db.commit()
+            await self._invalidate_cache(chunk)
+            removed.extend(chunk)
+        return removed
+
+    def _bulk_where(
+        self,
+        ids: Optional[Sequence[Any]],
+        where: Optional[Sequence[Any]],
+        chunk_size: int,
+    ) -> List[Sequence[Any]]:
+        """
+        生成批量操作的WHERE条件，必须指定 `ids` 或 `where` 其中之一
+        """
+        if (ids is None) == (where is None) or (where is not None and not where):
+            raise ValueError("Exactly one of `ids` or `where` must be given")
+        if where is not None:
+            return [where]
+        ids = list(ids)
+        return [
+            [self.model.id.in_(ids[start : start + chunk_size])]
+            for start in range(0, len(ids), chunk_size)
+        ]
+
     async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
         """
         删除对象
+        执行一条 `DELETE ... RETURNING`，不再先查询再删除
         """
-        result = await db.execute(select(self.model).filter(self.model.id == id))
-        obj = result.scalars().first()
-        await db.delete(obj)
+        result = await db.scalars(
+            delete(self.model).where(self.model.id == id).returning(self.model)
+        )
+        obj = result.first()
         await db.commit()
+        await self._invalidate_cache([id])
         return obj
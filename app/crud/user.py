@@ -1,13 +1,25 @@
-from typing import Any, Dict, Optional, Union
+import asyncio
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Union
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
-from app.crud.base import CRUDBase
+from app.core.outbox import add_to_outbox
+from app.core.principal import invalidate_principal
+from app.core.security import (
+    aget_password_hash,
+    averify_dummy_password,
+    averify_password,
+    password_hasher,
+)
+from app.crud.base import DEFAULT_CHUNK_SIZE, CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+# 用户创建后的Celery任务，按名称发送，避免导入worker
+USER_CREATED_TASK = "app.tasks.users.user_created"
+
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
@@ -28,19 +40,22 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         """
-        创建用户
-        """
-        db_obj = User(
-            email=obj_in.email,
-            username=obj_in.username,
-            hashed_password=get_password_hash(obj_in.password),
-            is_superuser=obj_in.is_superuser,
-            is_active=obj_in.is_active,
+        创建用户，`user_created` 任务通过发件箱与用户在同一个事务中写入
+        """
+        hashed_password = await aget_password_hash(obj_in.password)
+        user_id = uuid.uuid4()
+        add_to_outbox(db, USER_CREATED_TASK, user_id)
+        return await self._insert(
+            db,
+            {
+                "id": user_id,
+                "email": obj_in.email,
+                "username": obj_in.username,
+                "hashed_password": hashed_password,
+                "is_superuser": obj_in.is_superuser,
+                "is_active": obj_in.is_active,
+            },
         )
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
 
     async def update(
         self,
@@ -57,10 +72,97 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         else:
             update_data = obj_in.dict(exclude_unset=True)
         if update_data.get("password"):
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await aget_password_hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
-        return await super().update(db, db_obj=db_obj, obj_in=update_data)
+        updated = await super().update(db, db_obj=db_obj, obj_in=update_data)
+        await invalidate_principal(updated.id)
+        return updated
+
+    async def remove(self, db: AsyncSession, *, id: Any) -> User:
+        """
+        删除用户
+        """
+        obj = await super().remove(db, id=id)
+        await invalidate_principal(id)
+        return obj
+
+    async def create_many(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[UserCreate],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[User]:
+        """
+        批量创建用户
+        密码哈希在线程池中并行计算，每批不超过线程池的工作线程数
+        """
+        hashed_passwords: List[str] = []
+        step = password_hasher.max_workers
+        for start in range(0, len(objs_in), step):
+            hashed_passwords.extend(
+                await asyncio.gather(
+                    *(
+                        aget_password_hash(obj_in.password)
+                        for obj_in in objs_in[start : start + step]
+                    )
+                )
+            )
+        rows = [
+            {
+                "email": obj_in.email,
+                "username": obj_in.username,
+                "hashed_password": hashed_password,
+                "is_superuser": obj_in.is_superuser,
+                "is_active": obj_in.is_active,
+            }
+            for obj_in, hashed_password in zip(objs_in, hashed_passwords)
+        ]
+        return await super().create_many(db, objs_in=rows, chunk_size=chunk_size)
+
+    async def update_many(
+        self,
+        db: AsyncSession,
+        *,
+        obj_in: Union[UserUpdate, Dict[str, Any]],
+        ids: Optional[Sequence[Any]] = None,
+        where: Optional[Sequence[Any]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[Any]:
+        """
+        批量更新用户
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if update_data.get("password"):
+            update_data["hashed_password"] = await aget_password_hash(
+                update_data.pop("password")
+            )
+        updated = await super().update_many(
+            db, obj_in=update_data, ids=ids, where=where, chunk_size=chunk_size
+        )
+        await invalidate_principal(*updated)
+        return updated
+
+    async def remove_many(
+        self,
+        db: AsyncSession,
+        *,
+        ids: Optional[Sequence[Any]] = None,
+        where: Optional[Sequence[Any]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> List[Any]:
+        """
+        批量删除用户
+        """
+        removed = await super().remove_many(
+            db, ids=ids, where=where, chunk_size=chunk_size
+        )
+        await invalidate_principal(*removed)
+        return removed
 
     async def authenticate(
         self, db: AsyncSession, *, email: str, password: str
@@ -70,8 +172,9 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         """
         user = await self.get_by_email(db, email=email)
         if not user:
+            await averify_dummy_password(password)
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await averify_password(password, user.hashed_password):
             return None
         return user
 
@@ -83,8 +186,9 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         """
         user = await self.get_by_username(db, username=username)
         if not user:
+            await averify_dummy_password(password)
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await averify_password(password, user.hashed_password):
             return None
         return user
 
@@ -93,16 +197,27 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     ) -> Optional[User]:
         """
         通过用户名或邮箱验证用户
-        """
-        # 先尝试邮箱验证
-        user = await self.authenticate(db, email=username_or_email, password=password)
-        if user:
-            return user
+        使用一次查询同时匹配邮箱和用户名，最多执行一次密码验证
+        """
+        result = await db.execute(
+            select(User)
+            .filter(
+                or_(User.email == username_or_email, User.username == username_or_email)
+            )
+            .limit(2)
+        )
+        candidates = result.scalars().all()
+        if not candidates:
+            await averify_dummy_password(password)
+            return None
 
-        # 尝试用户名验证
-        return await self.authenticate_by_username(
-            db, username=username_or_email, password=password
+        # 邮箱匹配优先于用户名匹配
+        user = next(
+            (u for u in candidates if u.email == username_or_email), candidates[0]
         )
+        if not await averify_password(password, user.hashed_password):
+            return None
+        return user
 
     def is_active(self, user: User) -> bool:
         """
@@ -2,6 +2,7 @@
 from app.db.base_class import Base
 
 # 导入所有模型文件
+from app.models.outbox import OutboxMessage
 from app.models.user import User
 
 # 从这里添加更多模型，例如：
@@ -0,0 +1,110 @@
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+
+@dataclass
+class QueryStats:
+    """
+    单个请求的SQL统计
+    """
+
+    count: int = 0
+    db_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: Optional[str] = None
+    pool_wait_seconds: float = 0.0
+
+
+# 当前请求的SQL统计，由中间件设置
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def begin_query_stats() -> "tuple[QueryStats, Token]":
+    """
+    开始统计当前请求的SQL
+    """
+    stats = QueryStats()
+    return stats, _current_stats.set(stats)
+
+
+def end_query_stats(token: Token) -> None:
+    """
+    结束统计当前请求的SQL
+    """
+    _current_stats.reset(token)
+
+
+def record_pool_wait(seconds: float) -> None:
+    """
+    记录当前请求等待连接池的时间
+    """
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+def _redact(parameters: Any) -> Any:
+    """
+    隐藏SQL参数值，只保留结构
+    """
+    if isinstance(parameters, dict):
+        return {key: "?" for key in parameters}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return [_redact(p) for p in parameters]
+        return ["?"] * len(parameters)
+    return "?"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.db_seconds += elapsed
+        if elapsed > stats.slowest_seconds:
+            stats.slowest_seconds = elapsed
+            stats.slowest_statement = statement
+
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        # 参数写入消息本身，文本格式的日志不输出extra字段
+        redacted = _redact(parameters)
+        logger.bind(duration_ms=round(elapsed * 1000, 2), parameters=redacted).warning(
+            "Slow query ({:.2f} ms): {} parameters={}",
+            elapsed * 1000,
+            statement,
+            redacted,
+        )
+
+
+def _handle_error(context) -> None:
+    # 出错的语句不会触发after_cursor_execute，丢弃其开始时间
+    conn = context.connection
+    if conn is not None and context.execution_context is not None:
+        start_times = conn.info.get("query_start_time")
+        if start_times:
+            start_times.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    为引擎注册SQL计时事件
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
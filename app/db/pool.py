@@ -0,0 +1,70 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import (
+    db_pool_checkout_errors_total,
+    db_pool_checkout_wait_seconds,
+    db_pool_connections_in_use,
+)
+from app.db.instrumentation import record_pool_wait
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    记录连接签出等待时间的连接池
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._checkout_errors = 0
+        self._checkout_wait_seconds = 0.0
+        self._checkout_wait_seconds_max = 0.0
+
+    def _do_get(self) -> Any:
+        started_at = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self._checkout_errors += 1
+            db_pool_checkout_errors_total.inc()
+            raise
+        finally:
+            wait = time.perf_counter() - started_at
+            self._record_wait(wait)
+            record_pool_wait(wait)
+        db_pool_connections_in_use.inc()
+        return conn
+
+    def _do_return_conn(self, record: Any) -> None:
+        db_pool_connections_in_use.dec()
+        super()._do_return_conn(record)
+
+    def _record_wait(self, wait: float) -> None:
+        with self._stats_lock:
+            self._checkouts += 1
+            self._checkout_wait_seconds += wait
+            if wait > self._checkout_wait_seconds_max:
+                self._checkout_wait_seconds_max = wait
+        db_pool_checkout_wait_seconds.observe(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回连接池统计信息
+        """
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                "overflow": self.overflow(),
+                "checkouts": self._checkouts,
+                "checkout_errors": self._checkout_errors,
+                "checkout_wait_seconds_total": self._checkout_wait_seconds,
+                "checkout_wait_seconds_max": self._checkout_wait_seconds_max,
+            }
@@ -1,21 +1,270 @@
-from typing import AsyncGenerator
+import asyncio
+import itertools
+import os
+import re
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import CompoundSelect, Select, TextClause, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine
+from app.db.pool import InstrumentedAsyncQueuePool
 
-# 创建异步引擎
-engine = create_async_engine(
-    str(settings.DATABASE_URI),
-    echo=False,
-    future=True,
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """
+    根据数据库类型生成引擎参数
+
+    连接池参数只用于服务端数据库，asyncpg参数只用于asyncpg驱动，
+    这样副本也可以使用SQLite等本地数据库替代。
+    """
+    db_url = make_url(url)
+    options: Dict[str, Any] = {"echo": False, "future": True}
+    if db_url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if db_url.get_driver_name() == "asyncpg":
+        # asyncpg连接参数：预编译语句缓存大小和服务端语句超时
+        connect_args: Dict[str, Any] = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+        if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+            }
+        options["connect_args"] = connect_args
+    return options
+
+
+class ReplicaSet:
+    """
+    只读副本集合，轮询选择副本，出错的副本在一段时间内被剔除
+    """
+
+    def __init__(self, engines: List[AsyncEngine], eject_seconds: float):
+        self.engines = engines
+        self.eject_seconds = eject_seconds
+        self._ejected_until: Dict[int, float] = {}
+        self._counter = itertools.count()
+        for replica in engines:
+            self._watch(replica)
+
+    def _watch(self, replica: AsyncEngine) -> None:
+        @event.listens_for(replica.sync_engine, "handle_error")
+        def _on_error(context) -> None:
+            # 建连失败或连接断开时剔除该副本
+            if context.connection is None or context.is_disconnect:
+                self.eject(replica)
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """
+        轮询选择一个健康的副本，没有可用副本时返回None
+        """
+        now = time.monotonic()
+        healthy = [
+            replica
+            for replica in self.engines
+            if self._ejected_until.get(id(replica), 0.0) <= now
+        ]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def eject(self, replica: AsyncEngine) -> None:
+        """
+        暂时剔除副本
+        """
+        self._ejected_until[id(replica)] = time.monotonic() + self.eject_seconds
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        返回副本状态
+        """
+        now = time.monotonic()
+        return [
+            {
+                "url": replica.url.render_as_string(hide_password=True),
+                "healthy": self._ejected_until.get(id(replica), 0.0) <= now,
+            }
+            for replica in self.engines
+        ]
+
+
+class _ProcessEngines:
+    """
+    按进程惰性创建的主库和副本引擎
+
+    导入模块时不创建引擎，gunicorn `--preload` 的主进程和Celery的父进程
+    不会持有连接池；fork之后子进程首次使用时创建自己的引擎，
+    并以 `close=False` 丢弃继承的连接池，不关闭父进程的socket。
+    """
+
+    def __init__(self) -> None:
+        self._pid: Optional[int] = None
+        self._primary: Optional[AsyncEngine] = None
+        self._replicas: Optional[ReplicaSet] = None
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def _ensure(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            if self._primary is not None:
+                for inherited in [self._primary, *self._replicas.engines]:
+                    inherited.sync_engine.dispose(close=False)
+
+            primary = create_async_engine(
+                str(settings.DATABASE_URI),
+                **_engine_options(str(settings.DATABASE_URI)),
+            )
+            replica_set = ReplicaSet(
+                [
+                    create_async_engine(uri, **_engine_options(uri))
+                    for uri in settings.DATABASE_REPLICA_URIS
+                ],
+                eject_seconds=settings.DB_REPLICA_EJECT_SECONDS,
+            )
+            # 按需开启SQL计时
+            if settings.DB_QUERY_STATS_ENABLED:
+                for _engine in [primary, *replica_set.engines]:
+                    instrument_engine(_engine)
+            self._primary, self._replicas = primary, replica_set
+            self._pid = pid
+
+    @property
+    def primary(self) -> AsyncEngine:
+        self._ensure()
+        return self._primary
+
+    @property
+    def replicas(self) -> ReplicaSet:
+        self._ensure()
+        return self._replicas
+
+    def created(self) -> List[AsyncEngine]:
+        """
+        返回当前进程已经创建的引擎，不会触发创建
+        """
+        if self._pid != os.getpid():
+            return []
+        return [self._primary, *self._replicas.engines]
+
+
+_engines = _ProcessEngines()
+
+
+def get_engine() -> AsyncEngine:
+    """
+    返回当前进程的主库引擎
+    """
+    return _engines.primary
+
+
+def get_replicas() -> ReplicaSet:
+    """
+    返回当前进程的只读副本集合
+    """
+    return _engines.replicas
+
+
+async def dispose_engines() -> None:
+    """
+    关闭当前进程的所有连接池
+    """
+    for _engine in _engines.created():
+        await _engine.dispose()
+
+
+# 文本SQL中的行锁子句：FOR UPDATE / FOR NO KEY UPDATE / FOR SHARE / FOR KEY SHARE
+_ROW_LOCK_PATTERN = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+)?UPDATE\b|\bFOR\s+(?:KEY\s+)?SHARE\b", re.IGNORECASE
 )
 
+
+def _is_read_only(clause: Any) -> bool:
+    if isinstance(clause, (Select, CompoundSelect)):
+        read_only = clause._for_update_arg is None
+    elif isinstance(clause, TextClause):
+        sql = clause.text.lstrip()
+        read_only = sql[:6].upper() == "SELECT" and not _ROW_LOCK_PATTERN.search(sql)
+    else:
+        return False
+    return read_only and not clause.get_execution_options().get("use_primary")
+
+
+class PrimarySession(Session):
+    """
+    使用当前进程主库引擎的会话，显式指定了 `bind` 时使用指定的引擎
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.bind is not None:
+            return super().get_bind(mapper, clause=clause, **kw)
+        return get_engine().sync_engine
+
+
+class RoutingSession(Session):
+    """
+    读写分离会话
+
+    只读查询发送到副本，写操作和带 `FOR UPDATE` / `FOR SHARE` 的查询发送到主库。
+    会话一旦发生写操作（包括flush），后续查询都留在主库，保证读到自己的写入。
+    调用了有写入副作用的函数的SELECT无法识别，需要通过
+    `execution_options(use_primary=True)` 显式发送到主库。
+    同一个会话内固定使用同一个副本。
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("use_primary") or not _is_read_only(clause):
+            self.info["use_primary"] = True
+            return get_engine().sync_engine
+
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = get_replicas().choose() or get_engine()
+            self.info["replica"] = replica
+        return replica.sync_engine
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _pin_to_primary(session: Session, flush_context, instances) -> None:
+    # flush写入的数据只在主库可见，之后的查询都需要留在主库
+    session.info["use_primary"] = True
+
+
 # 创建异步会话
 AsyncSessionLocal = sessionmaker(
-    engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+# 创建读写分离的异步会话
+AsyncReadSessionLocal = sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -31,3 +280,62 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取只读数据库会话的依赖函数，查询优先发送到副本
+    """
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def warm_up_pool(connections: int) -> None:
+    """
+    预先建立数据库连接，避免首批请求承担建连延迟
+    """
+    connections = min(connections, settings.DB_POOL_SIZE)
+    if connections <= 0:
+        return
+
+    async def _open():
+        conn = await get_engine().connect()
+        await conn.execute(text("SELECT 1"))
+        return conn
+
+    conns = await asyncio.gather(*(_open() for _ in range(connections)))
+    for conn in conns:
+        await conn.close()
+
+
+async def replica_health() -> List[Dict[str, Any]]:
+    """
+    逐个检查只读副本的连接，出错的副本会被剔除
+    """
+    results = []
+    for replica in get_replicas().engines:
+        status = {"url": replica.url.render_as_string(hide_password=True)}
+        try:
+            async with replica.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            status["status"] = "ok"
+        except Exception as e:
+            status.update(status="error", message=str(e))
+        results.append(status)
+    return results
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    返回连接池统计信息
+    """
+    pool = get_engine().pool
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        stats = pool.stats()
+    else:
+        stats = {"status": pool.status()}
+    stats["replicas"] = get_replicas().stats()
+    return stats
@@ -1,29 +1,97 @@
+import asyncio
 from contextlib import asynccontextmanager
+from pathlib import Path
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.openapi.docs import get_swagger_ui_html
+from fastapi.openapi.docs import (
+    get_redoc_html,
+    get_swagger_ui_html,
+    get_swagger_ui_oauth2_redirect_html,
+)
 from fastapi.openapi.utils import get_openapi
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.api import api_router
+from app.core.cache import cache
 from app.core.config import settings
+from app.core.hashing import PasswordHasherBusyError
 from app.core.init_app import init_app
-from app.db.session import AsyncSessionLocal, get_db
+from app.core.jobs import job_runner
+from app.core.logging import setup_logging
+from app.core.metrics import flush_metrics_periodically
+from app.core.openapi import PrerenderedOpenAPI
+from app.core.rate_limit import RateLimit, rate_limiter
+from app.core.redis import close_redis
+from app.core.responses import FastJSONResponse
+from app.core.revocation import revocation_list
+from app.core.security import key_ring, password_hasher
+from app.db.session import AsyncSessionLocal, dispose_engines, get_db, warm_up_pool
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.utils.lazy import is_created, resolve
+
+setup_logging(
+    settings.LOG_LEVEL,
+    settings.LOG_FILE,
+    settings.LOG_JSON,
+    buffer_size=settings.LOG_BUFFER_SIZE,
+    batch_size=settings.LOG_BATCH_SIZE,
+    flush_interval=settings.LOG_FLUSH_INTERVAL_SECONDS,
+    sample_rate=settings.LOG_SAMPLE_RATE,
+    file_max_bytes=settings.LOG_FILE_MAX_BYTES,
+    file_backup_count=settings.LOG_FILE_BACKUP_COUNT,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 启动事件
+    # 签名密钥首次使用时才加载，在启动阶段主动加载使配置错误立即暴露
+    resolve(key_ring)
+    # 创建密码哈希线程池时会计算一次bcrypt哈希，不放在首个登录请求中
+    resolve(password_hasher)
+    await warm_up_pool(settings.DB_POOL_WARMUP_CONNECTIONS)
     async with AsyncSessionLocal() as db:
         await init_app(db)
+    # 使用gunicorn预加载时文档已在主进程中生成，worker共享
+    if settings.ENVIRONMENT != "development" and app.state.openapi_document is None:
+        app.state.openapi_document = build_openapi_document()
+    await job_runner.start()
+    metrics_task = asyncio.create_task(
+        flush_metrics_periodically(settings.METRICS_FLUSH_INTERVAL_SECONDS)
+    )
+    background_tasks = [
+        metrics_task,
+        asyncio.create_task(
+            revocation_list.sync_periodically(
+                settings.TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS
+            )
+        ),
+    ]
+    # 失效通知同时用于L1缓存和当前用户缓存，不受CACHE_ENABLED影响
+    background_tasks.append(asyncio.create_task(cache.listen_for_invalidations()))
     yield
-    # 关闭事件（如果需要）
+    # 关闭事件
+    await job_runner.stop(settings.JOBS_DRAIN_TIMEOUT_SECONDS)
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    if is_created(password_hasher):
+        password_hasher.shutdown()
+    await close_redis()
+    await dispose_engines()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    # OpenAPI文档和文档页面由下方路由提供
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
     description="""
     FastAPI Template 项目 API 文档
 
@@ -38,9 +106,62 @@ app = FastAPI(
     """,
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
-# 设置CORS
+
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(
+    request: Request, exc: PasswordHasherBusyError
+) -> FastJSONResponse:
+    """
+    密码哈希线程池饱和时返回429，登录、注册、修改密码等接口统一处理
+    """
+    return FastJSONResponse(
+        {"detail": "请求过多，请稍后重试"},
+        status_code=429,
+        headers={"Retry-After": "1"},
+    )
+
+
+# 压缩响应
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        offload_size=settings.COMPRESSION_OFFLOAD_SIZE,
+        content_types=settings.COMPRESSION_CONTENT_TYPES,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    )
+
+# 全局限流
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=rate_limiter,
+        per_ip=RateLimit.parse(settings.RATE_LIMIT_DEFAULT),
+        global_limit=RateLimit.parse(settings.RATE_LIMIT_GLOBAL),
+        exempt_prefixes=(
+            f"{settings.API_V1_STR}/health",
+            f"{settings.API_V1_STR}/metrics",
+            f"{settings.API_V1_STR}/openapi.json",
+            "/docs",
+            "/redoc",
+            "/.well-known",
+        ),
+    )
+
+# 按需统计每个请求的SQL
+if settings.DB_QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# 记录请求指标
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# 设置CORS，最后添加使其位于最外层，限流等中间件直接返回的响应也带有CORS头
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -88,6 +209,58 @@ def custom_openapi():
 
 
 app.openapi = custom_openapi
+app.state.openapi_document = None
+
+OPENAPI_URL = f"{settings.API_V1_STR}/openapi.json"
+SWAGGER_OAUTH2_REDIRECT_URL = "/docs/oauth2-redirect"
+
+
+def build_openapi_document() -> PrerenderedOpenAPI:
+    """
+    根据当前路由和模型生成OpenAPI文档及其压缩版本
+
+    在启动阶段调用一次：gunicorn预加载时在主进程中生成，worker共享。
+    """
+    return PrerenderedOpenAPI.from_schema(app.openapi())
+
+
+@app.get(OPENAPI_URL, include_in_schema=False)
+async def openapi_json(request: Request):
+    # 开发环境首次请求时生成，生产环境在启动时已加载
+    if app.state.openapi_document is None:
+        app.state.openapi_document = PrerenderedOpenAPI.from_schema(app.openapi())
+    return app.state.openapi_document.response(request)
+
+
+@app.get("/docs", include_in_schema=False)
+async def swagger_ui_html():
+    return get_swagger_ui_html(
+        openapi_url=OPENAPI_URL,
+        title=f"{settings.PROJECT_NAME} - Swagger UI",
+        oauth2_redirect_url=SWAGGER_OAUTH2_REDIRECT_URL,
+    )
+
+
+@app.get(SWAGGER_OAUTH2_REDIRECT_URL, include_in_schema=False)
+async def swagger_ui_redirect():
+    return get_swagger_ui_oauth2_redirect_html()
+
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc_html():
+    return get_redoc_html(
+        openapi_url=OPENAPI_URL, title=f"{settings.PROJECT_NAME} - ReDoc"
+    )
+
+
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks():
+    """
+    公开验证令牌的公钥，其他服务可以在本地验证令牌
+    """
+    return FastJSONResponse(
+        key_ring.jwks(), headers={"Cache-Control": "public, max-age=300"}
+    )
 
 
 @app.get("/")
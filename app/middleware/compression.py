@@ -0,0 +1,197 @@
+import time
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    compression_duration_seconds,
+    compression_input_bytes_total,
+    compression_output_bytes_total,
+    compression_ratio,
+)
+from app.utils.http import choose_encoding
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli为可选依赖
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard为可选依赖
+    zstandard = None
+
+
+class _Compressor:
+    """
+    统一不同压缩库的流式接口
+    """
+
+    def __init__(self, compress: Callable[[bytes], bytes], flush: Callable[[], bytes]):
+        self.compress = compress
+        self.flush = flush
+
+
+def _gzip_compressor(level: int) -> _Compressor:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return _Compressor(compressor.compress, compressor.flush)
+
+
+def _brotli_compressor(quality: int) -> _Compressor:
+    compressor = brotli.Compressor(quality=quality)
+    return _Compressor(compressor.process, compressor.finish)
+
+
+def _zstd_compressor(level: int) -> _Compressor:
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return _Compressor(compressor.compress, compressor.flush)
+
+
+class CompressionMiddleware:
+    """
+    响应压缩中间件
+
+    按Accept-Encoding协商 br/zstd/gzip 编码（`*` 按服务端偏好选择），只压缩内容类型在白名单中且
+    不小于 `minimum_size` 的响应；已带Content-Encoding的响应（如预压缩的
+    OpenAPI文档）原样返回。不小于 `offload_size` 的数据在线程池中压缩，
+    避免阻塞事件循环。流式响应逐块压缩。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        offload_size: int = 256 * 1024,
+        content_types: Iterable[str] = ("application/json",),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.content_types = frozenset(content_types)
+        # 按服务端偏好排序的可用编码
+        self.encoders: Dict[str, Callable[[], _Compressor]] = {}
+        if brotli is not None:
+            self.encoders["br"] = lambda: _brotli_compressor(brotli_quality)
+        if zstandard is not None:
+            self.encoders["zstd"] = lambda: _zstd_compressor(zstd_level)
+        self.encoders["gzip"] = lambda: _gzip_compressor(gzip_level)
+
+    def _choose_encoding(self, scope: Scope) -> Optional[str]:
+        accept_encoding = Headers(scope=scope).get("accept-encoding")
+        if not accept_encoding:
+            return None
+        return choose_encoding(accept_encoding, self.encoders)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._choose_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        # None 表示尚未决定是否压缩
+        self.compress: Optional[bool] = None
+        self.compressor: Optional[_Compressor] = None
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.elapsed = 0.0
+
+    def _should_compress(self, message: Message) -> bool:
+        if message["status"] in (204, 206, 304) or message["status"] < 200:
+            return False
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";", 1)[0].strip()
+        return content_type.lower() in self.middleware.content_types
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # 等到第一个响应体消息再决定是否压缩
+            self.start_message = message
+            self.compress = self._should_compress(message)
+            if not self.compress:
+                await self._send(message)
+            return
+        if message_type != "http.response.body" or not self.compress:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # 小响应压缩收益低于开销，原样返回
+                self.compress = False
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.compressor = self.middleware.encoders[self.encoding]()
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                await self._send(self.start_message)
+            else:
+                data = await self._run(body, final=True)
+                headers["Content-Length"] = str(len(data))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": data})
+                self._record()
+                return
+
+        data = await self._run(body, final=not more_body)
+        await self._send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
+        if not more_body:
+            self._record()
+
+    async def _run(self, body: bytes, final: bool) -> bytes:
+        if len(body) >= self.middleware.offload_size:
+            return await anyio.to_thread.run_sync(self._compress, body, final)
+        return self._compress(body, final)
+
+    def _compress(self, body: bytes, final: bool) -> bytes:
+        started_at = time.perf_counter()
+        chunks: List[bytes] = [self.compressor.compress(body)] if body else []
+        if final:
+            chunks.append(self.compressor.flush())
+        data = b"".join(chunks)
+        self.elapsed += time.perf_counter() - started_at
+        self.input_bytes += len(body)
+        self.output_bytes += len(data)
+        return data
+
+    def _record(self) -> None:
+        compression_duration_seconds.labels(self.encoding).observe(self.elapsed)
+        compression_input_bytes_total.labels(self.encoding).inc(self.input_bytes)
+        compression_output_bytes_total.labels(self.encoding).inc(self.output_bytes)
+        if self.input_bytes:
+            compression_ratio.labels(self.encoding).observe(
+                self.output_bytes / self.input_bytes
+            )
@@ -0,0 +1,45 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import request_metrics
+
+
+class MetricsMiddleware:
+    """
+    记录每个路由的请求延迟、状态码和正在处理的请求数
+
+    路由标签使用路由模板（如 `/api/v1/items/{id}`），避免标签基数膨胀。
+    数据先写入进程内缓冲，由后台任务批量写入Prometheus指标。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        request_metrics.in_progress += 1
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            request_metrics.in_progress -= 1
+            route = scope.get("route")
+            request_metrics.observe(
+                scope["method"],
+                getattr(route, "path", "<unmatched>"),
+                status_code,
+                elapsed,
+            )
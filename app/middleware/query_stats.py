@@ -0,0 +1,56 @@
+import time
+
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.instrumentation import begin_query_stats, end_query_stats
+
+
+class QueryStatsMiddleware:
+    """
+    统计每个请求的SQL语句数量和耗时
+
+    统计结果通过 `Server-Timing` 响应头返回，并在请求结束时写入日志。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = begin_query_stats()
+        started_at = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.count} queries", '
+                    f"db-slowest;dur={stats.slowest_seconds * 1000:.2f}, "
+                    f"db-pool;dur={stats.pool_wait_seconds * 1000:.2f}, "
+                    f"app;dur={(time.perf_counter() - started_at) * 1000:.2f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_query_stats(token)
+            logger.bind(
+                db_queries=stats.count,
+                db_time_ms=round(stats.db_seconds * 1000, 2),
+                db_slowest_ms=round(stats.slowest_seconds * 1000, 2),
+                db_slowest_statement=stats.slowest_statement,
+                db_pool_wait_ms=round(stats.pool_wait_seconds * 1000, 2),
+            ).info(
+                "{} {} - {} queries in {:.2f} ms",
+                scope["method"],
+                scope["path"],
+                stats.count,
+                stats.db_seconds * 1000,
+            )
@@ -0,0 +1,51 @@
+from typing import List, Optional, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.rate_limit import RateLimit, RateLimiter, client_ip, rate_limit_headers
+
+
+class RateLimitMiddleware:
+    """
+    全局限流中间件
+
+    按客户端IP和全局两个维度限流，超限时直接返回429，不进入路由。
+    `exempt_prefixes` 中的路径（如健康检查和监控指标）不限流。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        limiter: RateLimiter,
+        per_ip: Optional[RateLimit],
+        global_limit: Optional[RateLimit] = None,
+        exempt_prefixes: Sequence[str] = (),
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.per_ip = per_ip
+        self.global_limit = global_limit
+        self.exempt_prefixes = tuple(exempt_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        limits: List[Tuple[str, RateLimit]] = []
+        if self.per_ip is not None:
+            limits.append((f"api:ip:{client_ip(scope)}", self.per_ip))
+        if self.global_limit is not None:
+            limits.append(("api:global", self.global_limit))
+        result = await self.limiter.hit(limits)
+        if not result.allowed:
+            response = JSONResponse(
+                {"detail": "请求过多，请稍后重试"},
+                status_code=429,
+                headers=rate_limit_headers(limits[0][1], result),
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,32 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Identity,
+    Integer,
+    LargeBinary,
+    String,
+)
+
+from app.db.base_class import Base
+from app.utils.time import utc_now
+
+
+class OutboxMessage(Base):
+    """
+    事务性发件箱中待发送的Celery任务
+
+    与业务数据在同一个事务中写入，由中继进程按批发送到broker后删除。
+    """
+
+    __tablename__ = "outbox"
+
+    # SQLite只有INTEGER主键会自增
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"), Identity(), primary_key=True
+    )
+    task_name = Column(String, nullable=False)
+    queue = Column(String, nullable=True)
+    # msgpack编码的 `[args, kwargs]`
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
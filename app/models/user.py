@@ -2,7 +2,7 @@ import uuid
 from datetime import UTC, datetime, timezone
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy import Boolean, Column, DateTime, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -24,5 +24,8 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), default=utc_now)
     updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
 
+    # 游标分页使用的排序键索引
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)
+
     # 可以添加关系，例如：
     # items = relationship("Item", back_populates="owner")
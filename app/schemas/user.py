@@ -59,3 +59,7 @@ class UserInDB(UserInDBBase):
 class TokenPayload(BaseModel):
     sub: Optional[UUID] = None
     exp: Optional[int] = None
+    # 令牌类型（access/refresh）、会话ID和令牌ID
+    type: Optional[str] = None
+    sid: Optional[str] = None
+    jti: Optional[str] = None
@@ -0,0 +1,27 @@
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from app.tasks.batch import BATCH_QUEUE, TaskBatcher
+from app.utils.time import utc_now
+from app.worker import celery_app
+
+
+@celery_app.task(queue=BATCH_QUEUE)
+def write_audit_events(events: List[Dict[str, Any]]) -> None:
+    """
+    批量写入审计事件，每个事件包含 `action`、`time` 和附加字段
+    """
+    audit_logger = logger.bind(audit=True)
+    for event in events:
+        audit_logger.info(f"audit {event['action']}: {event}")
+
+
+audit_events = TaskBatcher(write_audit_events)
+
+
+def record_audit_event(action: str, **fields: Any) -> None:
+    """
+    记录一条审计事件，事件按批发送到worker，不等待broker
+    """
+    audit_events.add({"action": action, "time": utc_now(), **fields})
@@ -0,0 +1,92 @@
+import atexit
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from celery import Task
+from loguru import logger
+
+from app.core.config import settings
+
+# 批量任务使用的队列
+BATCH_QUEUE = "batch"
+
+
+class TaskBatcher:
+    """
+    把多个小任务合并为一次Celery任务执行
+
+    `add` 只把参数放入进程内的列表，攒够 `max_size` 条或等待 `max_wait` 秒后，
+    由后台线程调用一次 `task.apply_async(args=(items,))`，任务函数接收参数列表。
+    发送消息在后台线程中完成，事件循环中调用 `add` 不会等待broker。
+    进程退出前会发送剩余的参数；进程崩溃时未发送的参数会丢失，
+    只适合欢迎邮件、审计日志这类允许少量丢失的任务。
+    """
+
+    def __init__(
+        self,
+        task: Task,
+        max_size: Optional[int] = None,
+        max_wait: Optional[float] = None,
+        **options: Any,
+    ):
+        self.task = task
+        self.max_size = max_size or settings.CELERY_BATCH_MAX_SIZE
+        self.max_wait = max_wait or settings.CELERY_BATCH_MAX_WAIT_SECONDS
+        self.options: Dict[str, Any] = options
+        self._items: List[Any] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid: Optional[int] = None
+        atexit.register(self.flush)
+        # 父进程中未发送的参数由父进程负责发送
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def add(self, item: Any) -> None:
+        """
+        添加一个任务参数
+        """
+        if self._pid != os.getpid():
+            # 首次使用时在当前进程中启动发送线程
+            self._start()
+        with self._lock:
+            self._items.append(item)
+            size = len(self._items)
+        if size >= self.max_size:
+            self._wakeup.set()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(
+                target=self._run, name=f"batcher-{self.task.name}", daemon=True
+            ).start()
+
+    def _after_fork(self) -> None:
+        self._items = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.max_wait)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        立即发送所有已添加的参数，超过 `max_size` 时拆分为多个任务
+        """
+        with self._lock:
+            items, self._items = self._items, []
+        for start in range(0, len(items), self.max_size):
+            batch = items[start : start + self.max_size]
+            try:
+                self.task.apply_async(args=(batch,), **self.options)
+            except Exception:
+                logger.exception(
+                    f"Failed to publish {len(batch)} items to {self.task.name}"
+                )
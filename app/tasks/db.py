@@ -0,0 +1,116 @@
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Optional, TypeVar
+
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import AsyncSessionLocal, dispose_engines, get_engine
+
+T = TypeVar("T")
+
+
+class WorkerEventLoop:
+    """
+    Celery worker进程内常驻的事件循环
+
+    事件循环在后台线程中持续运行，任务通过 `run` 提交协程并等待结果，
+    连接池中的连接和Redis客户端都绑定在这个事件循环上，可以在任务之间复用；
+    每个任务调用 `asyncio.run` 则会反复创建事件循环，旧循环上的连接都无法再使用。
+    prefork、solo和threads执行池都可以使用。事件循环按进程惰性创建，fork之后
+    会在子进程中重新创建。
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        pid = os.getpid()
+        if self._loop is None or self._pid != pid:
+            with self._lock:
+                if self._loop is None or self._pid != pid:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(
+                        target=loop.run_forever, name="worker-event-loop", daemon=True
+                    )
+                    self._thread.start()
+                    self._loop = loop
+                    self._pid = pid
+        return self._loop
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._pid == os.getpid()
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        在常驻事件循环中执行协程并返回结果，不能在该事件循环内部调用
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        return future.result(timeout)
+
+    def stop(self) -> None:
+        """
+        停止事件循环，在worker进程退出时调用
+        """
+        if not self.running:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+
+
+worker_loop = WorkerEventLoop()
+
+
+def run_async(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    在Celery任务中执行异步代码，如CRUD操作：
+
+        @celery_app.task
+        def deactivate_users(user_ids):
+            return run_async(_deactivate_users(user_ids))
+    """
+    return worker_loop.run(coro, timeout)
+
+
+def task_session() -> AsyncSession:
+    """
+    创建任务使用的数据库会话，在 `run_async` 执行的协程中使用：
+    `async with task_session() as db: ...`
+    """
+    return AsyncSessionLocal()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs: Any) -> None:
+    """
+    prefork子进程启动时创建本进程的引擎并提前启动常驻事件循环
+
+    引擎按进程惰性创建，父进程已经创建过的引擎会以 `close=False` 丢弃，
+    不关闭父进程仍在使用的socket；子进程之后按需建立自己的连接。
+    """
+    get_engine()
+    worker_loop.run(asyncio.sleep(0))
+    logger.debug(f"Worker process {os.getpid()} initialized database pools")
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown_worker_process(**kwargs: Any) -> None:
+    """
+    worker进程退出前关闭连接池并停止事件循环
+    """
+    if not worker_loop.running:
+        return
+    try:
+        worker_loop.run(dispose_engines(), timeout=10)
+    except Exception:
+        logger.exception("Failed to dispose database pools")
+    worker_loop.stop()
@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import signal
+import time
+from datetime import timezone
+from typing import List, Optional, Sequence, Tuple
+
+import anyio
+from loguru import logger
+from prometheus_client import start_http_server
+from sqlalchemy import delete, select
+
+from app.core.cache import loads
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.core.metrics import (
+    outbox_messages_relayed_total,
+    outbox_relay_batch_duration_seconds,
+    outbox_relay_errors_total,
+    outbox_relay_lag_seconds,
+)
+from app.db.session import AsyncSessionLocal
+from app.models.outbox import OutboxMessage
+from app.utils.time import utc_now
+from app.worker import celery_app
+
+# (任务名, 队列, 参数)
+_Message = Tuple[str, Optional[str], bytes]
+
+
+class OutboxRelay:
+    """
+    把发件箱中的消息按批发送到broker
+
+    每批在一个事务中执行 `SELECT ... FOR UPDATE SKIP LOCKED`、发送并删除，
+    多个中继进程可以同时运行而不会重复领取同一批消息。
+    发送失败时事务回滚，消息留在发件箱中等待下一轮；
+    发送成功但删除前崩溃时消息会被再次发送。
+    """
+
+    def __init__(self, batch_size: int, poll_interval: float):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stopping = asyncio.Event()
+
+    async def relay_batch(self) -> int:
+        """
+        发送一批消息，返回发送的条数
+        """
+        started_at = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                rows = (
+                    await db.execute(
+                        select(
+                            OutboxMessage.id,
+                            OutboxMessage.task_name,
+                            OutboxMessage.queue,
+                            OutboxMessage.payload,
+                            OutboxMessage.created_at,
+                        )
+                        .order_by(OutboxMessage.id)
+                        .limit(self.batch_size)
+                        .with_for_update(skip_locked=True)
+                    )
+                ).all()
+                if not rows:
+                    return 0
+                await anyio.to_thread.run_sync(
+                    self._publish, [(row[1], row[2], row[3]) for row in rows]
+                )
+                published_at = utc_now()
+                await db.execute(
+                    delete(OutboxMessage).where(
+                        OutboxMessage.id.in_([row[0] for row in rows])
+                    )
+                )
+
+        for row in rows:
+            created_at = row[4]
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            outbox_relay_lag_seconds.observe(
+                (published_at - created_at).total_seconds()
+            )
+        outbox_messages_relayed_total.inc(len(rows))
+        outbox_relay_batch_duration_seconds.observe(time.perf_counter() - started_at)
+        return len(rows)
+
+    @staticmethod
+    def _publish(messages: Sequence[_Message]) -> None:
+        """
+        复用同一个producer连接发送一批消息
+        """
+        with celery_app.producer_or_acquire() as producer:
+            for task_name, queue, payload in messages:
+                args, kwargs = loads(payload)
+                celery_app.send_task(
+                    task_name, args=args, kwargs=kwargs, queue=queue, producer=producer
+                )
+
+    async def run(self) -> None:
+        """
+        持续发送直到 `stop()`，发件箱为空或出错时等待一个轮询间隔
+        """
+        logger.info(
+            f"Outbox relay started: batch_size={self.batch_size}, "
+            f"poll_interval={self.poll_interval}s"
+        )
+        while not self._stopping.is_set():
+            try:
+                count = await self.relay_batch()
+            except Exception:
+                logger.exception("Outbox relay batch failed")
+                outbox_relay_errors_total.inc()
+                count = 0
+            if count < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        logger.info("Outbox relay stopped")
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+async def _serve(relay: OutboxRelay) -> None:
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, relay.stop)
+    await relay.run()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    运行发件箱中继进程：
+    python -m app.tasks.outbox --batch-size 500 --metrics-port 9101
+    """
+    parser = argparse.ArgumentParser(description="Relay outbox messages to Celery")
+    parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE)
+    parser.add_argument(
+        "--poll-interval", type=float, default=settings.OUTBOX_POLL_INTERVAL_SECONDS
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, help="Expose Prometheus metrics on this port"
+    )
+    args = parser.parse_args(argv)
+
+    setup_logging(settings.LOG_LEVEL, settings.LOG_FILE, settings.LOG_JSON)
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    asyncio.run(_serve(OutboxRelay(args.batch_size, args.poll_interval)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from typing import List
+from uuid import UUID
+
+from app.crud.user import user
+from app.tasks.audit import write_audit_events
+from app.tasks.db import run_async, task_session
+from app.utils.time import utc_now
+from app.worker import celery_app
+
+
+async def _deactivate_users(user_ids: List[UUID]) -> int:
+    async with task_session() as db:
+        updated = await user.update_many(db, obj_in={"is_active": False}, ids=user_ids)
+    return len(updated)
+
+
+@celery_app.task(acks_late=True)
+def deactivate_users(user_ids: List[UUID]) -> int:
+    """
+    批量停用用户，返回被停用的用户数
+    """
+    return run_async(_deactivate_users(user_ids))
+
+
+@celery_app.task(acks_late=True)
+def user_created(user_id: UUID) -> None:
+    """
+    新用户创建后的处理，由发件箱中继在用户提交后发送，至少执行一次
+    """
+    write_audit_events(
+        [{"action": "user.created", "time": utc_now(), "user_id": user_id}]
+    )
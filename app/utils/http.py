@@ -0,0 +1,25 @@
+from typing import Dict, Iterable, Optional
+
+
+def choose_encoding(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """
+    按服务端偏好顺序选择客户端接受的编码，没有可用编码时返回None
+
+    `*` 匹配Accept-Encoding中未列出的编码，q=0 表示拒绝该编码。
+    """
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        quality = params.replace(" ", "")
+        try:
+            qualities[name] = float(quality[2:]) if quality.startswith("q=") else 1.0
+        except ValueError:
+            qualities[name] = 0.0
+    wildcard = qualities.get("*", 0.0)
+    for encoding in available:
+        if qualities.get(encoding, wildcard) > 0:
+            return encoding
+    return None
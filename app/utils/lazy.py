@@ -0,0 +1,62 @@
+import threading
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyObject(Generic[T]):
+    """
+    惰性创建的模块级单例代理
+
+    导入模块时只保存工厂函数，首次访问属性时才创建对象，之后的属性读写都转发给该对象。
+    用于依赖配置的单例，使导入模块时不解析配置；在gunicorn主进程中创建的对象会被worker继承。
+    """
+
+    __slots__ = ("_factory", "_wrapped", "_lock")
+
+    def __init__(self, factory: Callable[[], T]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_wrapped", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _setup(self) -> T:
+        wrapped: Optional[T] = self._wrapped
+        if wrapped is None:
+            with self._lock:
+                wrapped = self._wrapped
+                if wrapped is None:
+                    wrapped = self._factory()
+                    object.__setattr__(self, "_wrapped", wrapped)
+        return wrapped
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._setup(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._setup(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._setup(), name)
+
+    def __repr__(self) -> str:
+        if self._wrapped is None:
+            return f"<LazyObject {getattr(self._factory, '__name__', self._factory)!r}>"
+        return repr(self._wrapped)
+
+
+def is_created(obj: Any) -> bool:
+    """
+    惰性单例是否已经创建，普通对象总是返回True
+    """
+    if isinstance(obj, LazyObject):
+        return obj._wrapped is not None
+    return True
+
+
+def resolve(obj: T) -> T:
+    """
+    创建惰性单例并返回实际对象，普通对象原样返回
+    """
+    if isinstance(obj, LazyObject):
+        return obj._setup()
+    return obj
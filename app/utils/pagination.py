@@ -0,0 +1,51 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Sequence, Tuple
+
+# 游标方向
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "uuid" in value:
+            return uuid.UUID(value["uuid"])
+    return value
+
+
+def encode_cursor(direction: str, values: Sequence[Any]) -> str:
+    """
+    将分页方向和排序键的值编码为不透明游标
+    """
+    payload = {"d": direction, "k": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, List[Any]]:
+    """
+    解码游标，格式错误时抛出ValueError
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        direction = payload["d"]
+        values = [_decode_value(v) for v in payload["k"]]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if direction not in (CURSOR_NEXT, CURSOR_PREV):
+        raise ValueError(f"Invalid cursor direction: {direction}")
+    return direction, values
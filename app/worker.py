@@ -1,12 +1,30 @@
+from typing import Any, Dict
+
 from celery import Celery
+from celery.signals import celeryd_init
+from celery.utils.text import str_to_list
+from kombu import Queue
+from kombu.serialization import register
 
+from app.core.cache import dumps, loads
 from app.core.config import settings
 
+# 任务消息使用msgpack序列化，支持datetime、UUID、Decimal等类型
+TASK_SERIALIZER = "msgpack-ext"
+register(
+    TASK_SERIALIZER,
+    dumps,
+    loads,
+    content_type="application/x-msgpack-ext",
+    content_encoding="binary",
+)
+
 # 使用配置文件中的设置初始化Celery
 celery_app = Celery(
     "worker",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.tasks.audit", "app.tasks.users"],
 )
 
 # Celery配置
@@ -14,15 +32,50 @@ celery_app.conf.update(
     task_track_started=settings.CELERY_TASK_TRACK_STARTED,
     task_time_limit=settings.CELERY_TASK_TIME_LIMIT,
     timezone=settings.TIME_ZONE,  # 使用悉尼时区
+    # 消息体和结果使用msgpack序列化并压缩
+    task_serializer=TASK_SERIALIZER,
+    result_serializer=TASK_SERIALIZER,
+    accept_content=[TASK_SERIALIZER, "json"],
+    task_compression=settings.CELERY_TASK_COMPRESSION,
+    result_compression=settings.CELERY_TASK_COMPRESSION,
+    # 默认不保存任务结果，需要结果的任务使用 `ignore_result=False` 显式开启
+    task_ignore_result=True,
+    task_store_errors_even_if_ignored=False,
+    result_expires=settings.CELERY_RESULT_EXPIRES_SECONDS,
+    # 队列
+    task_default_queue=settings.CELERY_DEFAULT_QUEUE,
+    task_queues=[Queue(name) for name in settings.CELERY_QUEUES],
+    worker_prefetch_multiplier=settings.CELERY_QUEUE_PREFETCH.get(
+        settings.CELERY_DEFAULT_QUEUE, 1
+    ),
 )
 
 # 任务路由
 celery_app.conf.task_routes = {
-    "app.worker.test_celery": "main-queue",
+    "app.worker.test_celery": settings.CELERY_DEFAULT_QUEUE,
 }
 
 
-@celery_app.task(acks_late=True)
+@celeryd_init.connect
+def configure_worker_for_queue(
+    sender: str, conf: Any, options: Dict[str, Any], **kwargs: Any
+) -> None:
+    """
+    按worker消费的队列设置并发数和预取数量
+
+    每个队列使用单独的worker（`celery -A app.worker worker -Q batch`），
+    使用第一个队列的配置；命令行显式指定的 `--concurrency` 和
+    `--prefetch-multiplier` 优先。
+    """
+    queues = str_to_list(options.get("queues") or "") or [settings.CELERY_DEFAULT_QUEUE]
+    queue = queues[0]
+    if queue in settings.CELERY_QUEUE_CONCURRENCY:
+        conf.worker_concurrency = settings.CELERY_QUEUE_CONCURRENCY[queue]
+    if queue in settings.CELERY_QUEUE_PREFETCH:
+        conf.worker_prefetch_multiplier = settings.CELERY_QUEUE_PREFETCH[queue]
+
+
+@celery_app.task(acks_late=True, ignore_result=False)
 def test_celery(word: str) -> str:
     """
     测试Celery任务
@@ -0,0 +1,46 @@
+"""
+Gunicorn配置
+
+gunicorn启动时会自动加载当前目录下的该文件，命令行参数优先于这里的设置。
+"""
+
+import os
+import tempfile
+
+# Prometheus多进程模式：所有worker把指标写入同一目录下的mmap文件，
+# /metrics接口汇总所有worker的数据。每次启动使用新的目录，避免读取上次运行的残留数据。
+if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+
+
+def child_exit(server, worker):
+    """
+    worker退出时清理其livesum类型的gauge数据
+    """
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+# 在主进程中导入应用后再fork worker：worker共享已导入模块的内存页（写时复制），
+# 启动也更快。数据库引擎、Redis客户端和日志线程都按进程惰性创建，
+# 主进程不持有任何连接，不会被多个worker共用。
+preload_app = True
+
+
+def when_ready(server):
+    """
+    主进程导入应用完成后生成OpenAPI文档并冻结现有对象
+
+    文档在fork之前生成一次，worker共享，不必各自生成。
+    gc.freeze() 把这些对象移出垃圾回收的扫描范围，
+    避免worker中的垃圾回收修改对象头而触发写时复制，导致共享页被逐步复制。
+    """
+    import gc
+
+    from app.main import app, build_openapi_document
+
+    app.state.openapi_document = build_openapi_document()
+
+    gc.collect()
+    gc.freeze()
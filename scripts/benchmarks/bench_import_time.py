@@ -0,0 +1,77 @@
+"""
+应用导入耗时基准测试
+
+在子进程中使用 `python -X importtime` 导入指定模块，解析每个模块的
+自身耗时和累计耗时，取多次运行中的最小值，并列出自身耗时最高的模块。
+指定 `--budget-ms` 时，累计耗时超出预算则以非零状态退出，可以在CI中
+作为导入耗时的回归检查。
+
+用法: poetry run python scripts/benchmarks/bench_import_time.py [--module app.main] [--budget-ms 2500]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# (自身耗时, 累计耗时)，单位微秒
+_Timing = Tuple[int, int]
+
+
+def measure(module: str) -> Dict[str, _Timing]:
+    """
+    在新的解释器中导入模块，返回每个模块的导入耗时
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Failed to import {module}:\n{result.stderr}")
+
+    timings: Dict[str, _Timing] = {}
+    for line in result.stderr.splitlines():
+        # import time:       self [us] |  cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        timings[name] = (int(parts[0]), int(parts[1]))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--budget-ms", type=float, help="Fail if the cumulative import time exceeds"
+    )
+    args = parser.parse_args()
+
+    runs: List[Dict[str, _Timing]] = [measure(args.module) for _ in range(args.repeat)]
+    best = min(runs, key=lambda timings: timings[args.module][1])
+    total_ms = best[args.module][1] / 1000
+
+    print(f"{'self ms':>10} {'cumulative ms':>14}  module")
+    for name, (own, cumulative) in sorted(
+        best.items(), key=lambda item: item[1][0], reverse=True
+    )[: args.top]:
+        print(f"{own / 1000:10.1f} {cumulative / 1000:14.1f}  {name}")
+
+    print(f"\nimport {args.module}: {total_ms:.1f} ms (best of {args.repeat})")
+    if args.budget_ms is not None:
+        if total_ms > args.budget_ms:
+            print(f"over budget of {args.budget_ms:.0f} ms")
+            sys.exit(1)
+        print(f"within budget of {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+日志吞吐量基准测试
+
+多个线程同时记录日志，对比loguru同步写入、loguru `enqueue=True`
+与批量日志管道 `LogPipeline` 每秒能完成的日志调用次数，
+以及标准库logging经过拦截后的吞吐量。输出写入临时文件，不占用终端。
+
+用法: poetry run python scripts/benchmarks/bench_logging.py [-n 20000] [-t 8]
+"""
+
+import argparse
+import logging
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from loguru import logger
+
+from app.core.logging import InterceptHandler, LogPipeline
+
+FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | "
+    "{name}:{function}:{line} - {message}"
+)
+
+
+def run_threads(
+    log: Callable[[int], None], number: int, threads: int
+) -> Tuple[float, List[float]]:
+    """
+    每个线程记录 `number` 条日志，返回全部调用完成的耗时和每次调用的耗时
+    """
+    barrier = threading.Barrier(threads + 1)
+    latencies: List[float] = []
+
+    def worker() -> None:
+        local: List[float] = []
+        barrier.wait()
+        for i in range(number):
+            start = time.perf_counter()
+            log(i)
+            local.append(time.perf_counter() - start)
+        latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def report(
+    name: str, result: Tuple[float, List[float]], total: int, extra: str = ""
+) -> None:
+    elapsed, latencies = result
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    worst = latencies[-1] * 1e6
+    print(
+        f"{name:<24} {total / elapsed:12,.0f} calls/s"
+        f"  p99 {p99:8.1f} us  max {worst:10.1f} us {extra}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=20_000)
+    parser.add_argument("-t", "--threads", type=int, default=8)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    total = args.number * args.threads
+
+    def log_loguru(i: int) -> None:
+        logger.info("request handled path={} status={}", "/api/v1/users", i)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"threads: {args.threads}, calls per thread: {args.number}")
+
+        logger.remove()
+        logger.add(Path(tmp) / "sync.log", format=FORMAT, serialize=args.json)
+        report("loguru sync", run_threads(log_loguru, args.number, args.threads), total)
+
+        logger.remove()
+        sink_id = logger.add(
+            Path(tmp) / "enqueue.log", format=FORMAT, serialize=args.json, enqueue=True
+        )
+        result = run_threads(log_loguru, args.number, args.threads)
+        report("loguru enqueue", result, total)
+        logger.remove(sink_id)
+
+        for buffer_size in (10_000, total):
+            pipeline = LogPipeline(
+                log_file=Path(tmp) / f"pipeline-{buffer_size}.log",
+                stdout=False,
+                json_logs=args.json,
+                buffer_size=buffer_size,
+            )
+            logger.remove()
+            logger.add(pipeline.loguru_sink, format="{message}", backtrace=False)
+            result = run_threads(log_loguru, args.number, args.threads)
+            dropped = pipeline.dropped
+            pipeline.close()
+            report(
+                f"pipeline buffer={buffer_size}",
+                result,
+                total,
+                f"(dropped {dropped})",
+            )
+
+        pipeline = LogPipeline(
+            log_file=Path(tmp) / "stdlib.log",
+            stdout=False,
+            json_logs=args.json,
+            buffer_size=total,
+        )
+        std_logger = logging.getLogger("bench")
+        std_logger.handlers = [InterceptHandler(pipeline)]
+        std_logger.setLevel(logging.INFO)
+        std_logger.propagate = False
+        result = run_threads(
+            lambda i: std_logger.info("request handled status=%s", i),
+            args.number,
+            args.threads,
+        )
+        pipeline.close()
+        report("stdlib -> pipeline", result, total)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+指标中间件热路径开销基准测试
+
+直接调用ASGI应用，对比有无 `MetricsMiddleware` 时的单次请求耗时，
+差值即中间件在热路径上的开销。设置 `PROMETHEUS_MULTIPROC_DIR` 时测量
+多进程（mmap）模式下的开销。
+
+用法: poetry run python scripts/benchmarks/bench_metrics_middleware.py [-n 200000]
+      PROMETHEUS_MULTIPROC_DIR=$(mktemp -d) poetry run python \
+          scripts/benchmarks/bench_metrics_middleware.py
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from app.core.metrics import render_latest, request_metrics
+from app.middleware.metrics import MetricsMiddleware
+
+
+class _Route:
+    path = "/api/v1/items/{item_id}"
+
+
+async def endpoint(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def run(app, number: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/items/1"}
+    started_at = time.perf_counter()
+    for _ in range(number):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started_at) / number
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=200_000)
+    args = parser.parse_args()
+
+    middleware = MetricsMiddleware(endpoint)
+    # 预热，填充标签缓存
+    await run(middleware, 1_000)
+    await run(endpoint, 1_000)
+
+    bare = await run(endpoint, args.number)
+    instrumented = await run(middleware, args.number)
+
+    # 缓冲写入Prometheus指标的开销由后台任务承担，不在请求热路径上
+    started_at = time.perf_counter()
+    request_metrics.flush()
+    flush = time.perf_counter() - started_at
+
+    mode = "multiprocess" if os.environ.get("PROMETHEUS_MULTIPROC_DIR") else "single"
+    print(f"mode:              {mode}")
+    print(f"iterations:        {args.number}")
+    print(f"bare app:          {bare * 1e6:8.2f} us/request")
+    print(f"with middleware:   {instrumented * 1e6:8.2f} us/request")
+    print(f"overhead:          {(instrumented - bare) * 1e6:8.2f} us/request")
+    print(f"background flush:  {flush * 1e6:8.2f} us")
+    for line in render_latest()[0].decode().splitlines():
+        if line.startswith("http_request_duration_seconds_count"):
+            print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""
+OFFSET分页与游标分页延迟对比
+
+在种子数据表上分别测量第1页、第1千页和第10万页的查询延迟。
+默认使用临时SQLite数据库，也可以通过 `--url` 指定PostgreSQL。
+
+用法: poetry run python scripts/benchmarks/bench_pagination.py \
+    [--url postgresql+asyncpg://...] [--page-size 10] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.crud.base import CRUDBase
+from app.models.user import User
+from app.utils.pagination import CURSOR_NEXT, encode_cursor
+from app.utils.time import utc_now
+
+PAGES = (1, 1_000, 100_000)
+
+
+async def seed(db: AsyncSession, rows: int, batch_size: int = 10_000) -> None:
+    start = utc_now()
+    for offset in range(0, rows, batch_size):
+        batch = [
+            {
+                "id": uuid.uuid4(),
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "hashed_password": "x",
+                "created_at": start + timedelta(milliseconds=i),
+                "updated_at": start,
+            }
+            for i in range(offset, min(offset + batch_size, rows))
+        ]
+        await db.execute(insert(User), batch)
+        await db.commit()
+
+
+async def measure(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - started_at)
+    return statistics.median(timings) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.drop, checkfirst=True)
+        await conn.run_sync(User.__table__.create)
+
+    crud = CRUDBase(User)
+    rows = max(PAGES) * args.page_size
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        print(f"seeding {rows} rows ...")
+        await seed(db, rows)
+        print(f"rows: {await db.scalar(select(func.count()).select_from(User))}")
+
+        print(f"{'page':>8} {'offset (ms)':>12} {'keyset (ms)':>12}")
+        for page in PAGES:
+            skip = (page - 1) * args.page_size
+            cursor = None
+            if skip:
+                # 取上一页最后一行的排序键作为游标（不计入耗时）
+                anchor = await db.execute(
+                    select(User.created_at, User.id)
+                    .order_by(User.created_at, User.id)
+                    .offset(skip - 1)
+                    .limit(1)
+                )
+                cursor = encode_cursor(CURSOR_NEXT, list(anchor.one()))
+
+            async def offset_page():
+                await db.execute(
+                    select(User)
+                    .order_by(User.created_at, User.id)
+                    .offset(skip)
+                    .limit(args.page_size)
+                )
+                db.expunge_all()
+
+            async def keyset_page():
+                await crud.get_page(db, cursor=cursor, limit=args.page_size)
+                db.expunge_all()
+
+            offset_ms = await measure(offset_page, args.repeat)
+            keyset_ms = await measure(keyset_page, args.repeat)
+            print(f"{page:>8} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
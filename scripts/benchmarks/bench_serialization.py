@@ -0,0 +1,80 @@
+"""
+JSON响应序列化基准测试
+
+对比FastAPI默认路径（jsonable_encoder + 标准库json的JSONResponse）与
+`FastJSONResponse`（pydantic-core直接序列化为bytes）在 `/auth/me`
+单个用户和1000个用户列表两种负载下的耗时。
+
+用法: poetry run python scripts/benchmarks/bench_serialization.py [-n 2000]
+"""
+
+import argparse
+import timeit
+import uuid
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse
+from app.models.user import User
+from app.schemas.user import User as UserSchema
+from app.utils.time import utc_now
+
+
+def make_users(count: int) -> List[User]:
+    now = utc_now()
+    return [
+        User(
+            id=uuid.uuid4(),
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            hashed_password="x",
+            is_active=True,
+            is_superuser=False,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    users_adapter = TypeAdapter(List[UserSchema])
+    # 校验（ORM对象转Pydantic模型）两条路径相同，这里只测量序列化部分
+    me = UserSchema.model_validate(make_users(1)[0])
+    users = users_adapter.validate_python(make_users(1000), from_attributes=True)
+
+    cases = {
+        "/auth/me": (me, 1),
+        "1000 users": (users, 1000),
+    }
+
+    print(f"{'payload':<12} {'default (us)':>14} {'fast (us)':>12} {'speedup':>8}")
+    for name, (payload, size) in cases.items():
+        number = max(args.number * 100 // size, 20)
+        default_us = (
+            timeit.timeit(
+                lambda: JSONResponse(jsonable_encoder(payload)), number=number
+            )
+            / number
+            * 1e6
+        )
+        fast_us = (
+            timeit.timeit(lambda: FastJSONResponse(payload), number=number)
+            / number
+            * 1e6
+        )
+        print(
+            f"{name:<12} {default_us:>14.1f} {fast_us:>12.1f} "
+            f"{default_us / fast_us:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
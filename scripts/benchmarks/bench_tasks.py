@@ -0,0 +1,134 @@
+"""
+Celery任务端到端吞吐量基准测试
+
+使用内存broker在同一进程中启动worker，分别测量逐条发送任务和
+使用 `TaskBatcher` 合并发送时每秒完成的任务数，并对比json与
+msgpack+zstd两种消息编码的吞吐量和消息大小。
+
+用法: poetry run python scripts/benchmarks/bench_tasks.py [-n 5000] [--batch-size 100]
+"""
+
+import argparse
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from celery.contrib.testing.worker import start_worker
+from kombu.compression import compress
+from kombu.serialization import dumps
+
+from app.tasks.batch import TaskBatcher
+from app.utils.time import utc_now
+from app.worker import TASK_SERIALIZER, celery_app
+
+
+class Counter:
+    """
+    统计worker已处理的任务参数数量，达到目标后通知等待方
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self.value = 0
+        self.target = 0
+
+    def reset(self, target: int) -> None:
+        self.value, self.target = 0, target
+        self._done.clear()
+
+    def add(self, count: int) -> None:
+        with self._lock:
+            self.value += count
+            if self.value >= self.target:
+                self._done.set()
+
+    def wait(self, timeout: float) -> bool:
+        return self._done.wait(timeout)
+
+
+counter = Counter()
+
+
+@celery_app.task(name="bench.item")
+def bench_item(item: Dict[str, Any]) -> None:
+    counter.add(1)
+
+
+@celery_app.task(name="bench.batch")
+def bench_batch(items: List[Dict[str, Any]]) -> None:
+    counter.add(len(items))
+
+
+def make_item(i: int) -> Dict[str, Any]:
+    return {"action": "user.login", "user_id": i, "ip": "10.0.0.1", "time": utc_now()}
+
+
+def message_size(
+    payload: Any, serializer: str, compression: Optional[str]
+) -> Dict[str, int]:
+    _, _, body = dumps(payload, serializer=serializer)
+    size = len(body)
+    if compression:
+        body, _ = compress(body, compression)
+    return {"raw": size, "sent": len(body)}
+
+
+def run(name: str, number: int, send: Callable[[], None], timeout: float = 120) -> None:
+    counter.reset(number)
+    start = time.perf_counter()
+    send()
+    if not counter.wait(timeout):
+        print(f"{name:<36} timed out after {counter.value} tasks")
+        return
+    elapsed = time.perf_counter() - start
+    print(f"{name:<36} {number / elapsed:10,.0f} tasks/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    celery_app.conf.update(
+        broker_url="memory://",
+        result_backend="cache+memory://",
+        broker_transport_options={"polling_interval": 0.01},
+        accept_content=[TASK_SERIALIZER, "json"],
+    )
+    encodings = [("json", None), (TASK_SERIALIZER, "zstd")]
+
+    batch = [make_item(i) for i in range(args.batch_size)]
+    for serializer, compression in encodings:
+        single = message_size([make_item(0)], serializer, compression)
+        batched = message_size([batch], serializer, compression)
+        print(
+            f"{serializer}+{compression or 'none'}: single {single}, "
+            f"batch of {args.batch_size} {batched}"
+        )
+
+    with start_worker(celery_app, pool="solo", perform_ping_check=False):
+        for serializer, compression in encodings:
+            options = {"serializer": serializer, "compression": compression}
+            label = f"{serializer}+{compression or 'none'}"
+
+            def send_single() -> None:
+                for i in range(args.number):
+                    bench_item.apply_async(args=(make_item(i),), **options)
+
+            batcher = TaskBatcher(
+                bench_batch, max_size=args.batch_size, max_wait=0.05, **options
+            )
+
+            def send_batched() -> None:
+                for i in range(args.number):
+                    batcher.add(make_item(i))
+                batcher.flush()
+
+            run(f"single   {label}", args.number, send_single)
+            run(f"batched  {label}", args.number, send_batched)
+
+
+if __name__ == "__main__":
+    main()
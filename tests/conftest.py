@@ -0,0 +1,106 @@
+import os
+from typing import AsyncGenerator, List
+
+import httpx
+import pytest
+from fakeredis.aioredis import FakeRedis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+# 配置在首次访问时才读取，在导入应用模块之前设置测试环境变量
+os.environ.update(
+    {
+        "PROJECT_NAME": "FastAPI Template Test",
+        "API_V1_STR": "/api/v1",
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": "8000",
+        "SECRET_KEY": "test-secret-key",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+        "POSTGRES_SERVER": "localhost",
+        "POSTGRES_USER": "postgres",
+        "POSTGRES_PASSWORD": "postgres",
+        "POSTGRES_DB": "app",
+        "POSTGRES_PORT": "5432",
+        "REDIS_SERVER": "localhost",
+        "REDIS_PORT": "6379",
+        "REDIS_DB": "0",
+        "CELERY_BROKER_URL": "memory://",
+        "CELERY_RESULT_BACKEND": "cache+memory://",
+        "CELERY_TIMEZONE": "UTC",
+        "CELERY_TASK_TRACK_STARTED": "true",
+        "CELERY_TASK_TIME_LIMIT": "30",
+        "TIME_ZONE": "UTC",
+        "CACHE_ENABLED": "false",
+        "DATABASE_REPLICA_URIS": "[]",
+    }
+)
+
+from app.core.redis import set_redis  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import AsyncSessionLocal  # noqa: E402
+
+
+@pytest.fixture
+async def engine(tmp_path) -> AsyncGenerator[AsyncEngine, None]:
+    """
+    使用临时SQLite数据库的引擎，已创建所有表
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal(bind=engine) as session:
+        yield session
+
+
+@pytest.fixture
+def statements(engine: AsyncEngine) -> List[str]:
+    """
+    记录引擎执行的SQL语句，用于断言查询次数
+    """
+    executed: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+async def redis() -> AsyncGenerator[FakeRedis, None]:
+    """
+    使用内存中的fakeredis替代Redis
+    """
+    client = FakeRedis()
+    set_redis(client)
+    yield client
+    set_redis(None)
+    await client.aclose()
+
+
+@pytest.fixture
+async def client(
+    db: AsyncSession, redis: FakeRedis
+) -> AsyncGenerator[httpx.AsyncClient, None]:
+    """
+    请求应用的HTTP客户端，数据库使用测试会话，不运行应用的生命周期
+    """
+    from app.db.session import get_db
+    from app.main import app
+
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        yield http
+    app.dependency_overrides.pop(get_db, None)
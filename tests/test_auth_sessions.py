@@ -0,0 +1,100 @@
+import pytest
+
+from app.api.v1.endpoints.auth import _issue_tokens
+from app.core.revocation import RevocationList, revocation_list
+from app.crud.user import user as crud_user
+from app.models.user import User
+
+REFRESH_URL = "/api/v1/auth/refresh"
+
+
+@pytest.fixture
+async def sessions(redis):
+    """
+    清空进程内的撤销快照，避免测试之间互相影响
+    """
+    revocation_list._revoked.clear()
+    revocation_list._last_id = "0-0"
+    yield revocation_list
+    revocation_list._revoked.clear()
+    revocation_list._last_id = "0-0"
+
+
+@pytest.fixture
+async def stored_user(db) -> User:
+    return await crud_user._insert(
+        db,
+        {
+            "email": "session@example.com",
+            "username": "session",
+            "hashed_password": "secret-hash",
+        },
+    )
+
+
+async def test_replayed_refresh_token_is_rejected_and_revokes_session(redis):
+    sessions = RevocationList(prefix="auth:", retention_seconds=60)
+    await sessions.start_session("sid", "jti-1", 3600)
+
+    assert await sessions.rotate_session("sid", "jti-1", "jti-2", 3600)
+    # 旧令牌被重复使用，会话被撤销，当前令牌也随之失效
+    assert not await sessions.rotate_session("sid", "jti-1", "jti-3", 3600)
+    assert sessions.is_revoked("sid")
+    assert not await sessions.rotate_session("sid", "jti-2", "jti-4", 3600)
+
+
+async def test_revocation_reaches_other_workers_after_sync(redis):
+    worker_a = RevocationList(prefix="auth:", retention_seconds=60)
+    worker_b = RevocationList(prefix="auth:", retention_seconds=60)
+    await worker_b.sync()
+
+    await worker_a.revoke("sid")
+
+    assert worker_a.is_revoked("sid")
+    assert not worker_b.is_revoked("sid")
+    await worker_b.sync()
+    assert worker_b.is_revoked("sid")
+
+
+async def test_expired_revocations_are_pruned_on_sync(redis):
+    sessions = RevocationList(prefix="auth:", retention_seconds=-1)
+    await sessions.revoke("sid")
+
+    await sessions.sync()
+
+    assert not sessions.is_revoked("sid")
+
+
+async def test_refresh_rotates_and_rejects_replay(client, sessions, stored_user):
+    tokens = await _issue_tokens(stored_user.id)
+
+    rotated = await client.post(
+        REFRESH_URL, json={"refresh_token": tokens.refresh_token}
+    )
+    assert rotated.status_code == 200
+    new_refresh = rotated.json()["refresh_token"]
+    assert new_refresh != tokens.refresh_token
+
+    replayed = await client.post(
+        REFRESH_URL, json={"refresh_token": tokens.refresh_token}
+    )
+    assert replayed.status_code == 401
+    # 重放后整个会话被撤销，新签发的刷新令牌同样失效
+    after_replay = await client.post(REFRESH_URL, json={"refresh_token": new_refresh})
+    assert after_replay.status_code == 401
+
+
+async def test_logout_revokes_access_and_refresh_tokens(client, sessions, stored_user):
+    tokens = await _issue_tokens(stored_user.id)
+    headers = {"Authorization": f"Bearer {tokens.access_token}"}
+
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+    assert (
+        await client.post("/api/v1/auth/logout", headers=headers)
+    ).status_code == 200
+
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 403
+    refreshed = await client.post(
+        REFRESH_URL, json={"refresh_token": tokens.refresh_token}
+    )
+    assert refreshed.status_code == 401
@@ -0,0 +1,94 @@
+from typing import List, Tuple
+
+import pytest
+
+from app.core.security import get_password_hash, password_hasher, pwd_context
+from app.crud.user import user as crud_user
+from app.utils.lazy import resolve
+
+
+@pytest.fixture
+def verified_hashes(monkeypatch) -> List[str]:
+    """
+    记录密码哈希线程池中每次验证使用的哈希
+    """
+    hasher = resolve(password_hasher)
+    run = hasher.run
+    hashes: List[str] = []
+
+    async def spy(fn, *args):
+        if fn == pwd_context.verify:
+            hashes.append(args[1])
+        return await run(fn, *args)
+
+    monkeypatch.setattr(hasher, "run", spy)
+    return hashes
+
+
+@pytest.fixture
+async def users(db) -> Tuple[str, str]:
+    """
+    两个用户：一个的邮箱与另一个的用户名相同，返回两者的密码哈希
+    """
+    by_email = get_password_hash("email-password")
+    by_username = get_password_hash("username-password")
+    await crud_user._insert(
+        db,
+        {"email": "shared", "username": "alice", "hashed_password": by_email},
+    )
+    await crud_user._insert(
+        db,
+        {
+            "email": "bob@example.com",
+            "username": "shared",
+            "hashed_password": by_username,
+        },
+    )
+    return by_email, by_username
+
+
+async def test_both_matches_use_one_select_and_one_verify(
+    db, users, statements, verified_hashes
+):
+    by_email, _ = users
+    statements.clear()
+
+    user = await crud_user.authenticate_by_username_or_email(
+        db, username_or_email="shared", password="email-password"
+    )
+
+    assert user is not None and user.username == "alice"
+    assert len(statements) == 1
+    assert statements[0].startswith("SELECT")
+    # 邮箱匹配优先，只验证一次密码
+    assert verified_hashes == [by_email]
+
+
+async def test_username_match_is_verified(db, users, verified_hashes):
+    user = await crud_user.authenticate_by_username_or_email(
+        db, username_or_email="alice", password="email-password"
+    )
+
+    assert user is not None and user.email == "shared"
+    assert len(verified_hashes) == 1
+
+
+async def test_wrong_password_is_rejected(db, users, verified_hashes):
+    user = await crud_user.authenticate_by_username_or_email(
+        db, username_or_email="shared", password="username-password"
+    )
+
+    assert user is None
+    assert len(verified_hashes) == 1
+
+
+async def test_unknown_user_runs_dummy_verify(db, users, statements, verified_hashes):
+    statements.clear()
+
+    user = await crud_user.authenticate_by_username_or_email(
+        db, username_or_email="nobody", password="secret"
+    )
+
+    assert user is None
+    assert len(statements) == 1
+    assert verified_hashes == [password_hasher.dummy_hash]
@@ -0,0 +1,141 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List
+
+import pytest
+
+from app.core.cache import cache, cached, dumps, loads
+from app.core.config import get_settings
+from app.crud.user import user as crud_user
+from app.models.user import User
+from app.schemas.user import User as UserSchema
+
+
+@pytest.fixture
+async def redis(redis, monkeypatch):
+    """
+    开启缓存并使用内存中的fakeredis
+    """
+    monkeypatch.setattr(get_settings(), "CACHE_ENABLED", True)
+    cache.local.clear()
+    yield redis
+    cache.local.clear()
+
+
+@pytest.fixture
+async def stored_user(db) -> User:
+    return await crud_user._insert(
+        db,
+        {
+            "email": "cached@example.com",
+            "username": "cached",
+            "hashed_password": "secret-hash",
+        },
+    )
+
+
+def test_dumps_round_trip():
+    value = {
+        "time": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        "id": uuid.uuid4(),
+        "amount": Decimal("1.50"),
+        "items": [1, "a", None],
+    }
+
+    assert loads(dumps(value)) == value
+
+
+async def test_get_or_set_reads_through_both_levels(redis):
+    calls: List[int] = []
+
+    async def compute():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    key = cache.make_key("test", {"id": 1})
+    assert await cache.get_or_set(key, compute) == {"value": 1}
+    assert await cache.get_or_set(key, compute) == {"value": 1}
+    # L1被清空后从Redis读取
+    cache.local.clear()
+    assert await cache.get_or_set(key, compute) == {"value": 1}
+
+    assert len(calls) == 1
+    assert await redis.exists(key)
+
+
+async def test_concurrent_misses_compute_once(redis):
+    calls: List[int] = []
+
+    @cached(namespace="test.slow")
+    async def slow(id: int) -> int:
+        calls.append(id)
+        await asyncio.sleep(0.05)
+        return id * 2
+
+    results = await asyncio.gather(*(slow(7) for _ in range(10)))
+
+    assert results == [14] * 10
+    assert calls == [7]
+
+
+async def test_invalidate_tags_removes_tagged_keys(redis):
+    calls: List[int] = []
+
+    @cached(tags=["item:{id}"], namespace="test.item")
+    async def load(id: int) -> int:
+        calls.append(id)
+        return len(calls)
+
+    assert await load(1) == 1
+    assert await load(1) == 1
+
+    await cache.invalidate_tags("item:1")
+
+    assert await load(1) == 2
+
+
+async def test_get_cached_returns_schema_without_password_hash(
+    redis, db, stored_user, statements
+):
+    statements.clear()
+    first = await crud_user.get_cached(db, stored_user.id, schema=UserSchema)
+    second = await crud_user.get_cached(db, stored_user.id, schema=UserSchema)
+
+    assert isinstance(first, UserSchema)
+    assert first == second
+    assert len(statements) == 1
+    for key in await redis.keys("*"):
+        if await redis.type(key) == b"string":
+            assert b"secret-hash" not in await redis.get(key)
+
+
+async def test_get_cached_is_invalidated_by_update(redis, db, stored_user):
+    await crud_user.get_cached(db, stored_user.id, schema=UserSchema)
+
+    await crud_user.update(db, db_obj=stored_user, obj_in={"username": "renamed"})
+
+    cached_user = await crud_user.get_cached(db, stored_user.id, schema=UserSchema)
+    assert cached_user.username == "renamed"
+
+
+async def test_get_returns_attached_objects(redis, db, stored_user):
+    obj = await crud_user.get(db, stored_user.id)
+
+    assert obj in db
+
+
+async def test_l1_entry_does_not_outlive_redis_key(redis):
+    key = cache.make_key("test", {"id": 2})
+    await redis.set(key, dumps({"value": 2}), px=200)
+
+    async def compute():
+        raise AssertionError("should be served from Redis")
+
+    assert await cache.get_or_set(key, compute) == {"value": 2}
+    assert cache.local.get(key) is not None
+
+    await asyncio.sleep(0.3)
+
+    assert cache.local.get(key) is None
@@ -0,0 +1,159 @@
+import gzip
+from typing import Dict, List, Optional
+
+import anyio
+import brotli
+import pytest
+import zstandard
+from starlette.datastructures import Headers
+from starlette.types import Message
+
+from app.middleware.compression import CompressionMiddleware
+from app.utils.http import choose_encoding
+
+JSON = b'{"items": [' + b", ".join(b'"item"' for _ in range(500)) + b"]}"
+
+
+def make_app(
+    chunks: List[bytes],
+    content_type: str = "application/json",
+    headers: Optional[Dict[str, str]] = None,
+):
+    """
+    按给定分块返回响应体的ASGI应用，多于一块时为流式响应
+    """
+
+    async def app(scope, receive, send):
+        raw = [(b"content-type", content_type.encode())]
+        raw += [(k.encode(), v.encode()) for k, v in (headers or {}).items()]
+        if len(chunks) == 1:
+            raw.append((b"content-length", str(len(chunks[0])).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": raw})
+        for i, chunk in enumerate(chunks):
+            more_body = i < len(chunks) - 1
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+    return app
+
+
+async def request(app, accept_encoding: str, **options):
+    """
+    经过压缩中间件请求应用，返回响应头和拼接后的响应体
+    """
+    middleware = CompressionMiddleware(app, minimum_size=100, **options)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    messages: List[Message] = []
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    await middleware(scope, None, send)
+    headers = Headers(raw=messages[0]["headers"])
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return headers, body, messages
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, br, zstd", "br"),
+        ("gzip, zstd", "zstd"),
+        ("gzip", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("*", "br"),
+        ("*, br;q=0", "zstd"),
+        ("*;q=0, gzip", "gzip"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding, ("br", "zstd", "gzip")) == expected
+
+
+@pytest.mark.parametrize(
+    "encoding, decompress",
+    [
+        ("br", brotli.decompress),
+        (
+            "zstd",
+            lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data),
+        ),
+        ("gzip", gzip.decompress),
+    ],
+)
+async def test_negotiated_encoding_round_trips(encoding, decompress):
+    headers, body, _ = await request(make_app([JSON]), encoding)
+
+    assert headers["content-encoding"] == encoding
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(body) < len(JSON)
+    assert decompress(body) == JSON
+
+
+async def test_small_responses_are_not_compressed():
+    headers, body, _ = await request(make_app([b'{"ok": true}']), "gzip")
+
+    assert "content-encoding" not in headers
+    assert body == b'{"ok": true}'
+
+
+async def test_content_types_outside_allowlist_are_not_compressed():
+    headers, body, _ = await request(make_app([JSON], content_type="image/png"), "gzip")
+
+    assert "content-encoding" not in headers
+    assert body == JSON
+
+
+async def test_content_type_parameters_are_ignored():
+    app = make_app([JSON], content_type="application/json; charset=utf-8")
+    headers, _, _ = await request(app, "gzip")
+
+    assert headers["content-encoding"] == "gzip"
+
+
+async def test_already_encoded_responses_pass_through():
+    encoded = gzip.compress(JSON)
+    app = make_app([encoded], headers={"content-encoding": "gzip"})
+
+    headers, body, _ = await request(app, "br")
+
+    assert headers["content-encoding"] == "gzip"
+    assert body == encoded
+
+
+async def test_streaming_bodies_are_compressed_chunk_by_chunk():
+    chunks = [JSON[:10], JSON[10:2000], JSON[2000:]]
+
+    headers, body, messages = await request(make_app(chunks), "gzip")
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert len(messages) == 1 + len(chunks)
+    assert [m["more_body"] for m in messages[1:]] == [True, True, False]
+    assert gzip.decompress(body) == JSON
+
+
+async def test_large_bodies_are_compressed_in_a_thread(monkeypatch):
+    run_sync = anyio.to_thread.run_sync
+    offloaded: List[int] = []
+
+    async def spy(fn, *args, **kwargs):
+        offloaded.append(len(args[0]))
+        return await run_sync(fn, *args, **kwargs)
+
+    monkeypatch.setattr(anyio.to_thread, "run_sync", spy)
+
+    await request(make_app([JSON]), "gzip", offload_size=len(JSON))
+    assert offloaded == [len(JSON)]
+
+    offloaded.clear()
+    await request(make_app([JSON]), "gzip", offload_size=len(JSON) + 1)
+    assert offloaded == []
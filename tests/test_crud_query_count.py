@@ -0,0 +1,180 @@
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import func, select
+
+from app.crud.base import CRUDBase
+from app.models.user import User
+
+
+class UserIn(BaseModel):
+    username: str
+    email: str
+    hashed_password: str
+
+
+class UserUpdate(BaseModel):
+    username: str
+
+
+crud = CRUDBase[User, UserIn, UserUpdate](User)
+
+
+def make_user(i: int) -> UserIn:
+    return UserIn(
+        username=f"user{i}", email=f"user{i}@example.com", hashed_password="x"
+    )
+
+
+async def test_create_is_one_statement(db, statements: List[str]):
+    user = await crud.create(db, obj_in=make_user(1))
+
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT")
+    assert user.id is not None
+    assert user.created_at is not None
+
+
+async def test_update_is_one_statement(db, statements: List[str]):
+    user = await crud.create(db, obj_in=make_user(1))
+    statements.clear()
+
+    updated = await crud.update(db, db_obj=user, obj_in=UserUpdate(username="renamed"))
+
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE")
+    assert updated is user
+    assert user.username == "renamed"
+
+
+async def test_update_without_changes_skips_database(db, statements: List[str]):
+    user = await crud.create(db, obj_in=make_user(1))
+    statements.clear()
+
+    await crud.update(db, db_obj=user, obj_in={"unknown": 1})
+
+    assert statements == []
+
+
+async def test_remove_is_one_statement(db, statements: List[str]):
+    user = await crud.create(db, obj_in=make_user(1))
+    statements.clear()
+
+    removed = await crud.remove(db, id=user.id)
+
+    assert len(statements) == 1
+    assert statements[0].startswith("DELETE")
+    assert removed.id == user.id
+
+
+async def test_create_many_is_one_statement_per_chunk(db, statements: List[str]):
+    users = await crud.create_many(
+        db, objs_in=[make_user(i) for i in range(5)], chunk_size=2
+    )
+
+    assert len(statements) == 3
+    assert all(statement.startswith("INSERT") for statement in statements)
+    assert sorted(user.username for user in users) == [f"user{i}" for i in range(5)]
+    assert await db.scalar(select(func.count()).select_from(User)) == 5
+
+
+async def test_get_page_walks_forward_and_backward_across_ties(db):
+    created_at = [datetime(2024, 1, 1, tzinfo=timezone.utc)] * 3 + [
+        datetime(2024, 1, 2, tzinfo=timezone.utc)
+    ] * 2
+    for i, at in enumerate(created_at):
+        await crud._insert(db, {**make_user(i).model_dump(), "created_at": at})
+    expected = [
+        user.username
+        for user in await db.scalars(select(User).order_by(User.created_at, User.id))
+    ]
+
+    pages, cursor = [], None
+    while True:
+        page = await crud.get_page(db, cursor=cursor, limit=2)
+        pages.append([user.username for user in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # 相同created_at的行按id区分，翻页时不重复也不遗漏
+    assert sum(pages, []) == expected
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert page["prev_cursor"] is not None
+
+    backward, cursor = [], page["prev_cursor"]
+    while cursor is not None:
+        page = await crud.get_page(db, cursor=cursor, limit=2)
+        backward.insert(0, [user.username for user in page["items"]])
+        cursor = page["prev_cursor"]
+    assert backward == pages[:-1]
+    assert page["next_cursor"] is not None
+
+
+async def test_get_page_rejects_invalid_cursor(db):
+    with pytest.raises(ValueError):
+        await crud.get_page(db, cursor="not-a-cursor")
+
+
+async def test_update_many_is_one_statement_per_chunk(db, statements: List[str]):
+    users = await crud.create_many(db, objs_in=[make_user(i) for i in range(5)])
+    ids = [user.id for user in users[:3]]
+    statements.clear()
+
+    updated = await crud.update_many(
+        db, obj_in={"is_active": False, "unknown": 1}, ids=ids, chunk_size=2
+    )
+
+    assert len(statements) == 2
+    assert all(statement.startswith("UPDATE") for statement in statements)
+    assert sorted(updated) == sorted(ids)
+    inactive = await db.scalars(select(User.id).where(User.is_active.is_(False)))
+    assert sorted(inactive) == sorted(ids)
+
+
+async def test_update_many_by_condition_is_one_statement(db, statements: List[str]):
+    await crud.create_many(db, objs_in=[make_user(i) for i in range(3)])
+    statements.clear()
+
+    updated = await crud.update_many(
+        db, obj_in=UserUpdate(username="renamed"), where=[User.username == "user1"]
+    )
+
+    assert len(statements) == 1
+    assert len(updated) == 1
+    assert await db.scalar(select(User.username).where(User.id == updated[0])) == (
+        "renamed"
+    )
+
+
+async def test_remove_many_is_one_statement_per_chunk(db, statements: List[str]):
+    users = await crud.create_many(db, objs_in=[make_user(i) for i in range(5)])
+    ids = [user.id for user in users[:3]]
+    statements.clear()
+
+    removed = await crud.remove_many(db, ids=ids, chunk_size=2)
+
+    assert len(statements) == 2
+    assert all(statement.startswith("DELETE") for statement in statements)
+    assert sorted(removed) == sorted(ids)
+    assert await db.scalar(select(func.count()).select_from(User)) == 2
+
+
+async def test_bulk_operations_with_empty_ids_skip_database(db, statements: List[str]):
+    assert await crud.update_many(db, obj_in={"is_active": False}, ids=[]) == []
+    assert await crud.remove_many(db, ids=[]) == []
+    # 没有可更新的字段时也不访问数据库
+    assert await crud.update_many(db, obj_in={"unknown": 1}, ids=[1]) == []
+
+    assert statements == []
+
+
+@pytest.mark.parametrize(
+    "ids, where",
+    [(None, None), ([1], [User.id == 1]), (None, [])],
+)
+async def test_bulk_operations_need_exactly_one_filter(db, ids, where):
+    with pytest.raises(ValueError):
+        await crud.remove_many(db, ids=ids, where=where)
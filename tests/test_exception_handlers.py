@@ -0,0 +1,11 @@
+from app.core.hashing import PasswordHasherBusyError
+from app.main import app
+
+
+async def test_password_hasher_busy_returns_429_with_retry_after():
+    handler = app.exception_handlers[PasswordHasherBusyError]
+
+    response = await handler(None, PasswordHasherBusyError("saturated"))
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 与 `make import-time` 的默认预算一致
+IMPORT_TIME_BUDGET_MS = os.environ.get("IMPORT_TIME_BUDGET_MS", "2500")
+
+# 组装ASGI和Celery应用的模块，导入时读取配置
+APPLICATION_MODULES = ("app.main", "app.api", "app.worker", "app.tasks")
+
+_CHECK_SETTINGS = f"""
+import importlib
+import pkgutil
+
+import app
+from app.core.config import get_settings
+
+for info in pkgutil.walk_packages(app.__path__, "app."):
+    if not info.name.startswith({APPLICATION_MODULES!r}):
+        importlib.import_module(info.name)
+print(get_settings.cache_info().currsize)
+"""
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True
+    )
+
+
+def test_library_modules_do_not_load_settings():
+    result = run_python("-c", _CHECK_SETTINGS)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "0"
+
+
+def test_app_import_time_within_budget():
+    result = run_python(
+        "scripts/benchmarks/bench_import_time.py",
+        "--module",
+        "app.main",
+        "--repeat",
+        "3",
+        "--budget-ms",
+        IMPORT_TIME_BUDGET_MS,
+    )
+
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,41 @@
+from typing import List
+
+import pytest
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import get_settings
+from app.db.instrumentation import instrument_engine
+
+
+@pytest.fixture
+def messages(engine) -> List[str]:
+    instrument_engine(engine)
+    captured: List[str] = []
+    handler_id = logger.add(
+        lambda message: captured.append(message.record["message"]), level="WARNING"
+    )
+    yield captured
+    logger.remove(handler_id)
+
+
+async def test_slow_query_message_includes_redacted_parameters(
+    engine, messages, monkeypatch
+):
+    monkeypatch.setattr(get_settings(), "DB_SLOW_QUERY_MS", 0)
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT :secret"), {"secret": "hunter2"})
+
+    assert len(messages) == 1
+    assert "parameters=" in messages[0]
+    assert "?" in messages[0]
+    assert "hunter2" not in messages[0]
+
+
+async def test_failed_statement_does_not_leave_start_time(engine, messages):
+    async with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            await conn.execute(text("SELECT * FROM missing_table"))
+        assert not conn.sync_connection.info.get("query_start_time")
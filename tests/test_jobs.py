@@ -0,0 +1,83 @@
+import asyncio
+from typing import Any, List, Tuple
+
+import pytest
+
+from app.core.jobs import JobRunner, background_job
+
+
+class FakeTask:
+    """
+    记录转交参数的Celery任务替身
+    """
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[Any, ...]] = []
+
+    def apply_async(self, args=(), kwargs=None) -> None:
+        self.calls.append(tuple(args))
+
+
+@pytest.fixture
+def dead_letters() -> List[BaseException]:
+    return []
+
+
+@pytest.fixture
+async def runner(dead_letters: List[BaseException]):
+    runner = JobRunner(concurrency=2, queue_size=10)
+    runner.on_dead_letter(lambda job, exc: dead_letters.append(exc))
+    await runner.start()
+    yield runner
+    await runner.stop(timeout=1)
+
+
+async def drain(runner: JobRunner) -> None:
+    await asyncio.wait_for(runner._queue.join(), 5)
+
+
+async def test_budget_exceeded_hands_off_to_fallback(runner, dead_letters):
+    fallback = FakeTask()
+
+    @background_job(budget=0.01, fallback=fallback)
+    async def slow(value: int) -> None:
+        await asyncio.sleep(1)
+
+    runner.submit(slow, 1)
+    await drain(runner)
+
+    assert fallback.calls == [(1,)]
+    assert runner.stats()["fallback"] == 1
+    assert dead_letters == []
+
+
+async def test_timeout_raised_by_job_is_retried_not_handed_off(runner, dead_letters):
+    fallback = FakeTask()
+    attempts: List[int] = []
+
+    @background_job(max_retries=2, retry_delay=0, budget=5, fallback=fallback)
+    async def flaky() -> None:
+        attempts.append(1)
+        raise asyncio.TimeoutError
+
+    runner.submit(flaky)
+    await drain(runner)
+
+    assert len(attempts) == 3
+    assert fallback.calls == []
+    assert len(dead_letters) == 1
+    assert isinstance(dead_letters[0], TimeoutError)
+
+
+async def test_timeout_without_budget_goes_to_dead_letter(runner):
+    fallback = FakeTask()
+
+    @background_job(fallback=fallback)
+    async def no_budget() -> None:
+        raise TimeoutError("upstream")
+
+    runner.submit(no_budget)
+    await drain(runner)
+
+    assert fallback.calls == []
+    assert runner.stats()["failed"] == 1
@@ -0,0 +1,109 @@
+from pathlib import Path
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app import main
+from app.core.keys import KeyRing, generate_private_key_pem
+
+ALGORITHM = "ES256"
+
+
+def write_private_key(directory: Path, kid: str) -> bytes:
+    pem = generate_private_key_pem(ALGORITHM)
+    (directory / f"{kid}.pem").write_bytes(pem)
+    return pem
+
+
+def write_public_key(directory: Path, kid: str, private_pem: bytes) -> None:
+    public_key = serialization.load_pem_private_key(private_pem, None).public_key()
+    (directory / f"{kid}.pub.pem").write_bytes(
+        public_key.public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+
+
+@pytest.fixture
+def rotation(tmp_path):
+    """
+    轮换前只有 `old` 私钥；轮换后 `new` 用于签名，`old` 只保留公钥
+    """
+    before = tmp_path / "before"
+    after = tmp_path / "after"
+    before.mkdir()
+    after.mkdir()
+    old_pem = write_private_key(before, "old")
+    write_public_key(after, "old", old_pem)
+    write_private_key(after, "new")
+    return (
+        KeyRing.from_directory(before, ALGORITHM, "old"),
+        KeyRing.from_directory(after, ALGORITHM, "new"),
+    )
+
+
+def test_tokens_are_verified_by_kid_during_rotation(rotation):
+    old_ring, new_ring = rotation
+    old_token = old_ring.encode({"sub": "user"})
+    new_token = new_ring.encode({"sub": "user"})
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert new_ring.decode(old_token)["sub"] == "user"
+    assert new_ring.decode(new_token)["sub"] == "user"
+    # 轮换前的实例不认识新密钥
+    with pytest.raises(jwt.JWTError, match="Unknown key id"):
+        old_ring.decode(new_token)
+
+
+def test_token_with_forged_kid_is_rejected(rotation):
+    old_ring, new_ring = rotation
+    # 用旧私钥签名但声称是新密钥
+    forged = jwt.encode(
+        {"sub": "user"},
+        old_ring._signing_key,
+        algorithm=ALGORITHM,
+        headers={"kid": "new"},
+    )
+
+    with pytest.raises(jwt.JWTError):
+        new_ring.decode(forged)
+
+
+def test_signing_key_must_exist(tmp_path):
+    write_private_key(tmp_path, "old")
+
+    with pytest.raises(ValueError):
+        KeyRing.from_directory(tmp_path, ALGORITHM, "missing")
+
+
+def test_jwks_lists_public_keys_only(rotation):
+    _, new_ring = rotation
+
+    keys = new_ring.jwks()["keys"]
+
+    assert sorted(key["kid"] for key in keys) == ["new", "old"]
+    for key in keys:
+        assert key["use"] == "sig"
+        assert key["alg"] == ALGORITHM
+        assert key["kty"] == "EC"
+        assert "d" not in key
+
+
+def test_symmetric_keys_are_not_published():
+    ring = KeyRing.from_secret("secret", "HS256")
+
+    assert ring.jwks() == {"keys": []}
+    assert ring.decode(ring.encode({"sub": "user"}))["sub"] == "user"
+
+
+def test_jwks_endpoint(rotation, monkeypatch):
+    monkeypatch.setattr(main, "key_ring", rotation[1])
+
+    response = TestClient(main.app).get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=300"
+    assert response.json() == rotation[1].jwks()
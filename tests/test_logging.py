@@ -0,0 +1,90 @@
+import logging
+import os
+import threading
+from typing import List
+
+from app.core import logging as app_logging
+from app.core.logging import LogPipeline, _RotatingFile
+
+
+def test_rotation_keeps_backups(tmp_path):
+    path = tmp_path / "app.log"
+    log_file = _RotatingFile(path, max_bytes=10, backup_count=2)
+
+    for line in (b"first....\n", b"second...\n", b"third....\n"):
+        log_file.write(line)
+    log_file.close()
+
+    assert path.read_bytes() == b"third....\n"
+    assert (tmp_path / "app.log.1").read_bytes() == b"second...\n"
+    assert (tmp_path / "app.log.2").read_bytes() == b"first....\n"
+
+
+def test_rotation_without_backups_truncates(tmp_path):
+    path = tmp_path / "app.log"
+    log_file = _RotatingFile(path, max_bytes=10, backup_count=0)
+
+    log_file.write(b"first....\n")
+    log_file.write(b"second...\n")
+    log_file.close()
+
+    assert path.read_bytes() == b"second...\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["app.log"]
+
+
+def test_child_process_writes_its_own_file(tmp_path):
+    path = tmp_path / "app.log"
+    log_file = _RotatingFile(path, max_bytes=0, backup_count=0)
+    log_file.write(b"parent\n")
+
+    log_file.reopen_for_child()
+    log_file.write(b"child\n")
+    log_file.close()
+
+    assert path.read_bytes() == b"parent\n"
+    assert (tmp_path / f"app.{os.getpid()}.log").read_bytes() == b"child\n"
+
+
+def make_record(msg, *args) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_record_message_is_formatted_on_writer_thread(tmp_path):
+    pipeline = LogPipeline(log_file=tmp_path / "app.log", stdout=False)
+    formatted_on: List[str] = []
+
+    class Arg:
+        def __str__(self):
+            formatted_on.append(threading.current_thread().name)
+            return "value"
+
+    pipeline.submit_record(make_record("lazy %s", Arg()))
+    pipeline.submit_record(make_record("broken %d", "not a number"))
+    assert formatted_on == []
+    pipeline.flush(timeout=5)
+    pipeline.close()
+
+    lines = (tmp_path / "app.log").read_text().splitlines()
+    assert formatted_on == ["log-writer"]
+    assert lines[0].endswith("- lazy value")
+    # 格式化失败的日志保留原始内容，不影响同批其他日志
+    assert lines[1].endswith("- 'broken %d' % ('not a number',)")
+
+
+def test_fork_hook_only_reopens_current_pipeline(tmp_path, monkeypatch):
+    current = LogPipeline(log_file=tmp_path / "current.log", stdout=False)
+    closed = LogPipeline(log_file=tmp_path / "closed.log", stdout=False)
+    closed.close()
+    monkeypatch.setattr(app_logging, "log_pipeline", current)
+    reopened: List[str] = []
+    monkeypatch.setattr(
+        _RotatingFile,
+        "reopen_for_child",
+        lambda self: reopened.append(self.base_path.name),
+    )
+
+    app_logging._after_fork_in_child()
+    closed._after_fork()
+    current.close()
+
+    assert reopened == ["current.log"]
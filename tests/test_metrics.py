@@ -0,0 +1,38 @@
+from prometheus_client import REGISTRY
+
+from app.core.metrics import RequestMetricsBuffer
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_flush_writes_buffered_requests():
+    buffer = RequestMetricsBuffer()
+    labels = {"method": "GET", "route": "/buffered"}
+    for elapsed in (0.002, 0.002, 0.3):
+        buffer.observe("GET", "/buffered", 200, elapsed)
+    buffer.observe("GET", "/buffered", 500, 0.02)
+
+    # 写入前指标不变
+    assert sample("http_request_duration_seconds_count", **labels) == 0
+    buffer.flush()
+
+    assert sample("http_requests_total", status="200", **labels) == 3
+    assert sample("http_requests_total", status="500", **labels) == 1
+    assert sample("http_request_duration_seconds_count", **labels) == 4
+    assert abs(sample("http_request_duration_seconds_sum", **labels) - 0.324) < 1e-9
+    assert sample("http_request_duration_seconds_bucket", le="0.0025", **labels) == 2
+    assert sample("http_request_duration_seconds_bucket", le="0.25", **labels) == 3
+
+    # 已写入的增量不会重复写入
+    buffer.flush()
+    assert sample("http_request_duration_seconds_count", **labels) == 4
+
+
+async def test_metrics_route_has_no_redirect(client):
+    response = await client.get("/api/v1/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert b"http_requests_total" in response.content
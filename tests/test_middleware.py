@@ -0,0 +1,45 @@
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+from app.core.rate_limit import RateLimit, RateLimitResult
+from app.main import app
+from app.middleware.rate_limit import RateLimitMiddleware
+
+
+class DenyingLimiter:
+    """
+    总是拒绝请求的限流器替身
+    """
+
+    async def hit(self, limits) -> RateLimitResult:
+        return RateLimitResult(allowed=False, remaining=0, retry_after=1.5)
+
+
+def test_cors_is_outermost_middleware():
+    assert app.user_middleware[0].cls is CORSMiddleware
+
+
+def test_rate_limited_response_carries_cors_headers():
+    api = FastAPI()
+
+    @api.get("/items")
+    async def items():
+        return []
+
+    api.add_middleware(
+        RateLimitMiddleware,
+        limiter=DenyingLimiter(),
+        per_ip=RateLimit.parse("10/minute"),
+    )
+    api.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://example.com"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    response = TestClient(api).get("/items", headers={"Origin": "http://example.com"})
+
+    assert response.status_code == 429
+    assert response.headers["access-control-allow-origin"] == "http://example.com"
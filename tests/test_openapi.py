@@ -0,0 +1,28 @@
+import gzip
+
+import orjson
+from fastapi.testclient import TestClient
+
+from app.main import app, build_openapi_document
+
+
+def test_document_is_built_from_the_running_app():
+    document = build_openapi_document()
+
+    assert orjson.loads(document.body) == app.openapi()
+    assert gzip.decompress(document.gzip_body) == document.body
+
+
+def test_served_document_supports_etag_and_gzip(monkeypatch):
+    monkeypatch.setattr(app.state, "openapi_document", build_openapi_document())
+    client = TestClient(app)
+
+    response = client.get("/api/v1/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == app.openapi()
+
+    cached = client.get(
+        "/api/v1/openapi.json", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert cached.status_code == 304
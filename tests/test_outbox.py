@@ -0,0 +1,75 @@
+from typing import Any, List, Tuple
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import func, select
+
+from app.core.cache import loads
+from app.core.outbox import add_to_outbox
+from app.crud.user import USER_CREATED_TASK
+from app.crud.user import user as crud_user
+from app.db import session as db_session
+from app.models.outbox import OutboxMessage
+from app.schemas.user import UserCreate
+from app.tasks.outbox import OutboxRelay
+from app.worker import celery_app
+
+
+@pytest.fixture
+def sent(engine, monkeypatch) -> List[Tuple[str, Any, Any, Any]]:
+    """
+    中继使用测试数据库，记录发送到broker的任务
+    """
+    monkeypatch.setattr(db_session, "get_engine", lambda: engine)
+    messages: List[Tuple[str, Any, Any, Any]] = []
+
+    def send_task(name, args=None, kwargs=None, queue=None, producer=None):
+        messages.append((name, args, kwargs, queue))
+
+    monkeypatch.setattr(celery_app, "send_task", send_task)
+    return messages
+
+
+async def outbox_size(db) -> int:
+    return await db.scalar(select(func.count()).select_from(OutboxMessage))
+
+
+async def test_user_creation_writes_outbox_message(db):
+    created = await crud_user.create(
+        db,
+        obj_in=UserCreate(
+            email="alice@example.com", username="alice", password="secret"
+        ),
+    )
+
+    message = (await db.scalars(select(OutboxMessage))).one()
+    assert message.task_name == USER_CREATED_TASK
+    assert loads(message.payload) == [[created.id], {}]
+
+
+async def test_relay_publishes_and_deletes_in_batches(db, sent):
+    for i in range(3):
+        add_to_outbox(db, "tasks.example", i, queue="batch", flag=True)
+    await db.commit()
+    lag_count = REGISTRY.get_sample_value("outbox_relay_lag_seconds_count")
+    relay = OutboxRelay(batch_size=2, poll_interval=0)
+
+    assert [await relay.relay_batch() for _ in range(3)] == [2, 1, 0]
+
+    assert sent == [("tasks.example", [i], {"flag": True}, "batch") for i in range(3)]
+    assert await outbox_size(db) == 0
+    assert REGISTRY.get_sample_value("outbox_relay_lag_seconds_count") == lag_count + 3
+
+
+async def test_failed_publish_keeps_messages(db, sent, monkeypatch):
+    add_to_outbox(db, "tasks.example", 1)
+    await db.commit()
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("broker unavailable")
+
+    monkeypatch.setattr(celery_app, "send_task", fail)
+    with pytest.raises(ConnectionError):
+        await OutboxRelay(batch_size=10, poll_interval=0).relay_batch()
+
+    assert await outbox_size(db) == 1
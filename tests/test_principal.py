@@ -0,0 +1,95 @@
+import asyncio
+import uuid
+
+import msgpack
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from app.core.cache import cache
+from app.core.principal import (
+    cache_principal,
+    get_cached_principal,
+    invalidate_principal,
+    principal_cache,
+)
+from app.core.redis import set_redis
+from app.models.user import User
+
+
+@pytest.fixture
+async def listener():
+    """
+    使用fakeredis运行失效通知订阅，模拟API进程
+    """
+    client = FakeRedis()
+    set_redis(client)
+    principal_cache.clear()
+    task = asyncio.create_task(cache.listen_for_invalidations(poll_interval=0.01))
+    # 等待订阅建立
+    await asyncio.sleep(0.05)
+    yield client
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    principal_cache.clear()
+    set_redis(None)
+    await client.aclose()
+
+
+def make_user() -> User:
+    return User(
+        id=uuid.uuid4(),
+        username="principal",
+        email="principal@example.com",
+        hashed_password="secret-hash",
+        is_active=True,
+        is_superuser=False,
+    )
+
+
+async def wait_until_evicted(user_id: uuid.UUID) -> bool:
+    for _ in range(50):
+        if get_cached_principal(user_id) is None:
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+def test_snapshot_excludes_password_hash():
+    user = make_user()
+    cache_principal(user)
+
+    assert "hashed_password" not in principal_cache.get(user.id)
+    cached_user = get_cached_principal(user.id)
+    assert cached_user.username == "principal"
+    assert cached_user.is_active
+    principal_cache.clear()
+
+
+async def test_invalidation_from_another_process_is_applied(listener):
+    user = make_user()
+    cache_principal(user)
+
+    # Celery worker等其他进程只发布通知，不持有本进程的缓存
+    await cache.publish_invalidation("principal", [user.id])
+
+    assert await wait_until_evicted(user.id)
+
+
+async def test_invalidate_principal_clears_local_cache(listener):
+    users = [make_user() for _ in range(2)]
+    for user in users:
+        cache_principal(user)
+
+    await invalidate_principal(*(user.id for user in users))
+
+    assert all(get_cached_principal(user.id) is None for user in users)
+
+
+async def test_unrelated_keys_do_not_evict_principals(listener):
+    user = make_user()
+    cache_principal(user)
+
+    await listener.publish(cache.channel, msgpack.packb([b"cache:other"]))
+    await asyncio.sleep(0.05)
+
+    assert get_cached_principal(user.id) is not None
@@ -0,0 +1,104 @@
+import httpx
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from fastapi import FastAPI
+
+from app.core.rate_limit import RateLimit, RateLimiter
+from app.core.redis import set_redis
+from app.middleware.rate_limit import RateLimitMiddleware
+
+PER_IP = RateLimit.parse("5/minute")
+PER_ACCOUNT = RateLimit.parse("1/minute")
+
+
+@pytest.fixture
+async def broken_redis():
+    """
+    连接失败的Redis，用于测试进程内限流的退化路径
+    """
+    server = FakeServer()
+    server.connected = False
+    client = FakeRedis(server=server)
+    set_redis(client)
+    yield client
+    set_redis(None)
+    await client.aclose()
+
+
+async def test_denied_hit_consumes_no_bucket(redis):
+    limiter = RateLimiter(prefix="rl:")
+    limits = [("ip:1.2.3.4", PER_IP), ("account:alice", PER_ACCOUNT)]
+
+    first = await limiter.hit(limits)
+    second = await limiter.hit(limits)
+
+    assert first.allowed
+    assert not second.allowed
+    assert 0 < second.retry_after <= 60
+    # 账号维度超限时IP维度也不扣减
+    ip_tokens = float(await redis.hget("rl:ip:1.2.3.4", "tokens"))
+    assert 4 <= ip_tokens < 4.1
+    assert await redis.pttl("rl:ip:1.2.3.4") > 0
+
+
+async def test_buckets_are_shared_across_limiters(redis):
+    rule = RateLimit.parse("2/minute")
+    limits = [("global", rule)]
+
+    results = [await RateLimiter(prefix="rl:").hit(limits) for _ in range(3)]
+
+    assert [result.allowed for result in results] == [True, True, False]
+    assert results[1].remaining == 0
+
+
+async def test_falls_back_to_local_buckets_when_redis_fails(broken_redis):
+    limiter = RateLimiter(prefix="rl:", redis_retry_seconds=60)
+    limits = [("account:alice", PER_ACCOUNT)]
+
+    first = await limiter.hit(limits)
+    second = await limiter.hit(limits)
+
+    assert first.allowed
+    assert not second.allowed
+    assert 59 <= second.retry_after <= 60
+
+    # Redis恢复后，在重试间隔内仍使用进程内令牌桶
+    healthy = FakeRedis()
+    set_redis(healthy)
+    try:
+        assert not (await limiter.hit(limits)).allowed
+        assert await healthy.exists("rl:account:alice") == 0
+    finally:
+        await healthy.aclose()
+
+
+async def test_middleware_returns_429_with_retry_after(redis):
+    api = FastAPI()
+
+    @api.get("/items")
+    async def items():
+        return []
+
+    @api.get("/health")
+    async def health():
+        return {}
+
+    api.add_middleware(
+        RateLimitMiddleware,
+        limiter=RateLimiter(prefix="rl:"),
+        per_ip=RateLimit.parse("1/minute"),
+        exempt_prefixes=("/health",),
+    )
+    transport = httpx.ASGITransport(app=api)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        allowed = await client.get("/items")
+        denied = await client.get("/items")
+        exempt = await client.get("/health")
+
+    assert allowed.status_code == 200
+    assert denied.status_code == 429
+    assert denied.headers["Retry-After"] == "60"
+    assert denied.headers["X-RateLimit-Limit"] == "1"
+    assert denied.headers["X-RateLimit-Remaining"] == "0"
+    assert exempt.status_code == 200
@@ -0,0 +1,134 @@
+from typing import List
+
+import pytest
+from sqlalchemy import column, select, table, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.db import session as db_session
+from app.db.session import AsyncReadSessionLocal, ReplicaSet, replica_health
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Origin(Base):
+    __tablename__ = "origin"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+
+
+async def make_stand_in(path: str, name: str) -> AsyncEngine:
+    """
+    创建一个SQLite替身数据库，表 `origin` 中记录数据库的名字
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE origin (name TEXT)"))
+        await conn.execute(text("INSERT INTO origin VALUES (:name)"), {"name": name})
+    return engine
+
+
+@pytest.fixture
+async def databases(tmp_path, monkeypatch):
+    """
+    一个主库和两个副本，替换当前进程的引擎
+    """
+    primary = await make_stand_in(tmp_path / "primary.db", "primary")
+    replicas = ReplicaSet(
+        [
+            await make_stand_in(tmp_path / f"replica{i}.db", f"replica{i}")
+            for i in range(2)
+        ],
+        eject_seconds=60,
+    )
+    monkeypatch.setattr(db_session, "get_engine", lambda: primary)
+    monkeypatch.setattr(db_session, "get_replicas", lambda: replicas)
+    yield primary, replicas
+    for engine in [primary, *replicas.engines]:
+        await engine.dispose()
+
+
+async def read_origin(db, query=text("SELECT name FROM origin")) -> str:
+    return (await db.execute(query)).scalar()
+
+
+async def test_reads_round_robin_across_replicas(databases):
+    origins: List[str] = []
+    for _ in range(4):
+        async with AsyncReadSessionLocal() as db:
+            origin = await read_origin(db)
+            # 同一个会话内固定使用同一个副本
+            assert await read_origin(db) == origin
+            origins.append(origin)
+
+    assert origins == ["replica0", "replica1", "replica0", "replica1"]
+
+
+async def test_writes_and_later_reads_stay_on_primary(databases):
+    async with AsyncReadSessionLocal() as db:
+        await db.execute(text("INSERT INTO origin VALUES ('written')"))
+        assert await read_origin(db) == "primary"
+        await db.rollback()
+
+
+async def test_select_for_update_goes_to_primary(databases):
+    query = select(column("name")).select_from(table("origin")).with_for_update()
+    async with AsyncReadSessionLocal() as db:
+        assert await read_origin(db, query) == "primary"
+
+
+async def test_failed_replica_is_ejected(databases, tmp_path, monkeypatch):
+    primary, replicas = databases
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/db.sqlite")
+    replicas = ReplicaSet([broken, replicas.engines[0]], eject_seconds=60)
+    monkeypatch.setattr(db_session, "get_replicas", lambda: replicas)
+
+    health = await replica_health()
+
+    assert [status["status"] for status in health] == ["error", "ok"]
+    assert [status["healthy"] for status in replicas.stats()] == [False, True]
+    for _ in range(3):
+        async with AsyncReadSessionLocal() as db:
+            assert await read_origin(db) == "replica0"
+    await broken.dispose()
+
+
+async def test_falls_back_to_primary_without_healthy_replicas(databases):
+    primary, replicas = databases
+    for replica in replicas.engines:
+        replicas.eject(replica)
+
+    async with AsyncReadSessionLocal() as db:
+        assert await read_origin(db) == "primary"
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT name FROM origin FOR UPDATE",
+        "select name from origin for no key update skip locked",
+        "SELECT name FROM origin\nFOR SHARE",
+    ],
+)
+async def test_text_row_locks_go_to_primary(databases, sql):
+    # SQLite不支持行锁子句，只检查路由结果
+    async with AsyncReadSessionLocal() as db:
+        bind = db.sync_session.get_bind(clause=text(sql))
+    assert bind is databases[0].sync_engine
+
+
+async def test_use_primary_execution_option(databases):
+    query = text("SELECT name FROM origin").execution_options(use_primary=True)
+    async with AsyncReadSessionLocal() as db:
+        assert await read_origin(db, query) == "primary"
+
+
+async def test_flush_pins_session_to_primary(databases):
+    async with AsyncReadSessionLocal() as db:
+        assert await read_origin(db) == "replica0"
+        db.add(Origin(name="flushed"))
+        await db.flush()
+        assert await read_origin(db) == "primary"
+        await db.rollback()
@@ -0,0 +1,45 @@
+import uuid
+from datetime import datetime, timezone
+
+import orjson
+
+from app.core.responses import FastJSONResponse
+from app.schemas.user import User as UserSchema
+
+CREATED_AT = datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc)
+
+
+def make_user() -> UserSchema:
+    return UserSchema(
+        id=uuid.uuid4(),
+        email="alice@example.com",
+        username="alice",
+        created_at=CREATED_AT,
+        updated_at=CREATED_AT,
+    )
+
+
+def test_user_times_are_serialized_in_sydney_time():
+    user = make_user()
+
+    body = orjson.loads(FastJSONResponse(user).body)
+
+    # 模型中保存的仍是UTC时间，只在序列化时转换
+    assert user.created_at == CREATED_AT
+    assert user.created_at.utcoffset().total_seconds() == 0
+    assert body["created_at"] == "2024-01-01T11:00:00+11:00"
+    assert body == orjson.loads(user.model_dump_json())
+
+
+def test_lists_of_models_use_the_same_serializer():
+    body = orjson.loads(FastJSONResponse([make_user(), make_user()]).body)
+
+    assert [item["updated_at"] for item in body] == ["2024-01-01T11:00:00+11:00"] * 2
+
+
+def test_other_content_is_rendered_with_orjson():
+    user_id = uuid.uuid4()
+
+    body = orjson.loads(FastJSONResponse({"id": user_id, 1: CREATED_AT}).body)
+
+    assert body == {"id": str(user_id), "1": "2024-01-01T00:00:00+00:00"}
@@ -0,0 +1,92 @@
+import hashlib
+import time
+import uuid
+from datetime import timedelta
+from typing import List
+
+import pytest
+from jose import jwt
+
+from app.core import security
+from app.core.security import create_access_token, decode_access_token
+from app.schemas.user import TokenPayload
+from app.utils.lru import LRUCache
+
+USER_ID = uuid.uuid4()
+
+
+def cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+@pytest.fixture
+def token_cache(monkeypatch) -> LRUCache:
+    cache: LRUCache = LRUCache(maxsize=100)
+    monkeypatch.setattr(security, "token_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def verified(monkeypatch) -> List[str]:
+    """
+    记录实际做签名验证的令牌
+    """
+    ring = security.key_ring
+    decode = ring.decode
+    tokens: List[str] = []
+
+    def spy(token: str):
+        tokens.append(token)
+        return decode(token)
+
+    monkeypatch.setattr(ring, "decode", spy)
+    return tokens
+
+
+def test_cached_token_skips_signature_check(token_cache, verified):
+    token = create_access_token(USER_ID, session_id="sid")
+
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+
+    assert second is first
+    assert (second.sub, second.sid) == (USER_ID, "sid")
+    assert verified == [token]
+
+
+def test_cache_ttl_is_capped_at_expiry(token_cache, monkeypatch):
+    ttls: List[float] = []
+    set_entry = token_cache.set
+    monkeypatch.setattr(
+        token_cache,
+        "set",
+        lambda key, value, ttl=None: ttls.append(ttl) or set_entry(key, value, ttl),
+    )
+    token = create_access_token(USER_ID, expires_delta=timedelta(seconds=60))
+
+    payload = decode_access_token(token)
+
+    assert len(ttls) == 1
+    assert 0 < ttls[0] <= 60
+    assert ttls[0] == pytest.approx(payload.exp - time.time(), abs=1)
+
+
+def test_expired_token_is_not_served_from_cache(token_cache, verified):
+    token = create_access_token(USER_ID, expires_delta=timedelta(seconds=-10))
+    # 模拟缓存条目比令牌活得更久，例如写入时的TTL计算有偏差
+    token_cache.set(cache_key(token), TokenPayload(exp=int(time.time()) - 10), ttl=3600)
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_access_token(token)
+
+    assert verified == [token]
+    assert token_cache.get(cache_key(token)) is None
+
+
+def test_refresh_tokens_are_rejected_and_not_cached(token_cache):
+    token = security.create_refresh_token(USER_ID, session_id="sid", token_id="jti")
+
+    with pytest.raises(jwt.JWTError):
+        decode_access_token(token)
+
+    assert len(token_cache) == 0
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import session as db_session
+from app.tasks import db as tasks_db
+from app.tasks.db import WorkerEventLoop, task_session
+
+
+@pytest.fixture
+def worker_loop():
+    loop = WorkerEventLoop()
+    yield loop
+    loop.stop()
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """
+    任务使用的SQLite引擎，在常驻事件循环中首次建立连接
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tasks.db'}")
+    monkeypatch.setattr(db_session, "get_engine", lambda: engine)
+    return engine
+
+
+async def query_in_task():
+    """
+    模拟一个任务：查询数据库，返回使用的事件循环、引擎和底层连接
+    """
+    async with task_session() as db:
+        await db.execute(text("SELECT 1"))
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        return asyncio.get_running_loop(), db.get_bind(), raw.driver_connection
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+
+def test_tasks_share_loop_engine_and_connection(worker_loop, engine):
+    first = worker_loop.run(query_in_task())
+    second = worker_loop.run(query_in_task())
+
+    loop, bind, connection = first
+    assert second == (loop, bind, connection)
+    assert bind is engine.sync_engine
+    # 连接在任务之间留在连接池中复用
+    assert engine.pool.checkedin() == 1
+    worker_loop.run(engine.dispose())
+
+
+def test_loop_is_rebuilt_after_fork(worker_loop, monkeypatch):
+    parent_loop = worker_loop.run(_current_loop())
+    parent_thread = worker_loop._thread
+
+    monkeypatch.setattr(tasks_db.os, "getpid", lambda: -1)
+    child_loop = worker_loop.run(_current_loop())
+
+    assert child_loop is not parent_loop
+    assert worker_loop.running
+    assert worker_loop.run(_current_loop()) is child_loop
+    worker_loop.stop()
+    # 父进程的事件循环线程在真实fork后不存在，这里手动停止
+    parent_loop.call_soon_threadsafe(parent_loop.stop)
+    parent_thread.join(timeout=5)
+    parent_loop.close()